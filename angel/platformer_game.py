@@ -2,9 +2,23 @@ import pygame
 import random
 import sys
 import os
-import math
+
+# Shared modules live in the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from asset_loader import AssetLoader
+from dirty_rects import DirtyRectRenderer
+from frame_profiler import FIXED_STEP_PHASES, TOGGLE_KEY, profiler_from_argv
+from particle_pool import ParticlePool
+from platformer_sim import PlatformerSim, FixedTimestep, INPUT_LEFT, INPUT_RIGHT, INPUT_BOOST
+from replay import InputRecorder, record_path_from_argv
+from sound_dispatcher import PLATFORMER_GROUPS, PLATFORMER_SOUNDS, SoundDispatcher, init_mixer
+from sprite_batch import SpriteBatch, paint_boost_orb
+from starfield import Starfield
+from text_cache import TextCache
+from ui import Label, Panel
 
 # Initialize pygame
+init_mixer()  # Small mixer buffer so effects start within a few milliseconds
 pygame.init()
 pygame.mixer.init()  # Initialize the mixer for sound
 
@@ -36,16 +50,9 @@ screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Platformer Jumper")
 clock = pygame.time.Clock()
 
-# Background elements
-stars = []
-for _ in range(100):  # Create 100 stars
-    x = random.randint(0, WIDTH)
-    y = random.randint(0, HEIGHT)
-    size = random.randint(1, 3)
-    brightness = random.randint(100, 255)
-    twinkle_speed = random.uniform(0.01, 0.05)
-    twinkle_offset = random.uniform(0, 2 * math.pi)
-    stars.append([x, y, size, brightness, twinkle_speed, twinkle_offset])
+# Background elements: (star count, parallax) per layer; stars move at 70% of platform speed
+STAR_LAYERS = [(100, 0.7)]
+starfield = Starfield(WIDTH, HEIGHT, STAR_LAYERS)
 
 # Create background gradient surface
 background = pygame.Surface((WIDTH, HEIGHT))
@@ -59,10 +66,15 @@ for y in range(HEIGHT):
 
 # Sound variables
 sound_enabled = True
-jump_sound = None
-boost_sound = None
-land_sound = None
-game_over_sound = None
+STARTUP_BUDGET = 0.5  # Seconds allowed for all assets to finish loading
+
+# Sounds load in the background; the dispatcher skips any that aren't ready yet
+assets = AssetLoader(budget=STARTUP_BUDGET)
+
+def start_music(path):
+    pygame.mixer.music.set_volume(0.5)
+    if not sim.game_over:
+        sounds.play_music()
 
 # Check if sound files exist, if not, suggest generating them
 sound_files = ["jump.wav", "boost.wav", "land.wav", "gameover.wav", "background.wav"]
@@ -74,261 +86,157 @@ if not all_files_exist:
     print("Continuing without sound...")
     sound_enabled = False
 else:
-    # Load sound effects
-    try:
-        jump_sound = pygame.mixer.Sound(os.path.join("sounds", "jump.wav"))
-        jump_sound.set_volume(0.7)
-        
-        boost_sound = pygame.mixer.Sound(os.path.join("sounds", "boost.wav"))
-        boost_sound.set_volume(0.8)
-        
-        land_sound = pygame.mixer.Sound(os.path.join("sounds", "land.wav"))
-        land_sound.set_volume(0.6)
-        
-        game_over_sound = pygame.mixer.Sound(os.path.join("sounds", "gameover.wav"))
-        game_over_sound.set_volume(0.9)
-        
-        # Load and play background music
-        pygame.mixer.music.load(os.path.join("sounds", "background.wav"))
-        pygame.mixer.music.set_volume(0.5)
-        pygame.mixer.music.play(-1)  # -1 means loop indefinitely
-        
-        sound_enabled = True
-        print("Sound effects loaded successfully!")
-    except Exception as e:
-        print(f"Error loading sounds: {e}")
-        sound_enabled = False
+    # Load sound effects and background music
+    assets.sound("jump", os.path.join("sounds", "jump.wav"), volume=0.7)
+    assets.sound("boost", os.path.join("sounds", "boost.wav"), volume=0.8)
+    assets.sound("land", os.path.join("sounds", "land.wav"), volume=0.6)
+    assets.sound("game_over", os.path.join("sounds", "gameover.wav"), volume=0.9)
+    assets.music("music", os.path.join("sounds", "background.wav"), on_ready=start_music)
+sounds = SoundDispatcher(PLATFORMER_GROUPS, PLATFORMER_SOUNDS, assets.get, enabled=sound_enabled)
 
 # Game variables
-player_pos = [WIDTH // 2, HEIGHT - 100]  # Center position of the player
+# Physics, platforms and score live in the headless sim; its level is generated ahead on a worker thread
+sim = PlatformerSim(random.getrandbits(32), threaded=True)
 player_radius = PLAYER_SIZE // 2
-platforms = []
-player_velocity_y = 0
-score = 0
-game_over = False
 font = pygame.font.SysFont(None, 36)
-boost_jumps = 3  # Limited number of boost jumps
-on_ground = False  # Track if player is on a platform
-visited_platforms = set()  # Track platforms the player has already visited
+text_cache = TextCache()  # HUD strings are rendered once and reused
+
+# Game over screen: the dimming layer is built once, the score label re-renders only when it changes
+game_over_screen = Panel((0, 0, WIDTH, HEIGHT), (0, 0, 0, 128), composite=False)
+game_over_screen.add(Label((WIDTH // 2 - 180, HEIGHT // 2), "GAME OVER! Press R to restart", font))
+final_score_label = game_over_screen.add(Label((WIDTH // 2 - 80, HEIGHT // 2 + 40), "", font))
 show_sound_status = True  # Show sound status at start
 sound_status_timer = 180  # Show for 3 seconds (60 FPS * 3)
 
 # Particle system for boost jump effect
-particles = []
+particles = ParticlePool()
 
-class Particle:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.vx = random.uniform(-1, 1)
-        self.vy = random.uniform(-2, 0)
-        self.radius = random.randint(2, 6)
-        self.color = (random.randint(200, 255), random.randint(100, 200), 0)
-        self.lifetime = random.randint(20, 40)
-    
-    def update(self):
-        self.x += self.vx
-        self.y += self.vy
-        self.vy += 0.05  # Gravity effect on particles
-        self.lifetime -= 1
-        # Fade out effect
-        if self.lifetime < 10:
-            self.radius *= 0.9
-    
-    def draw(self, surface):
-        if self.radius > 0.5:
-            pygame.draw.circle(surface, self.color, (int(self.x), int(self.y)), int(self.radius))
+# The ball and boost orbs are rasterized once; each layer of them and the HUD text is one blits call
+sprites = SpriteBatch()
+sprites.circle("ball", RED, player_radius)
+sprites.circle("shine", (255, 200, 200), int(player_radius * 0.25))
+sprites.define("boost_orb", (24, 24), paint_boost_orb, anchor=(2, 2))
 
-# Create initial platforms
-def create_platforms():
-    # Starting platform directly under the player
-    platforms.append(pygame.Rect(WIDTH // 2 - PLATFORM_WIDTH // 2, HEIGHT - 50, PLATFORM_WIDTH, PLATFORM_HEIGHT))
-    
-    # Create platforms with more consistent spacing
-    for i in range(15):  # More platforms
-        x = random.randint(50, WIDTH - PLATFORM_WIDTH - 50)  # Keep away from edges
-        y = HEIGHT - 150 - i * PLATFORM_GAP  # Consistent vertical spacing
-        platforms.append(pygame.Rect(x, y, PLATFORM_WIDTH, PLATFORM_HEIGHT))
+# Run with --dirty to redraw and present only the changed parts of the screen
+renderer = DirtyRectRenderer(screen, background, enabled="--dirty" in sys.argv)
 
-create_platforms()
+profiler = profiler_from_argv(FIXED_STEP_PHASES, sys.argv)
 
-# Function to play a sound safely
-def play_sound(sound):
-    if sound_enabled and sound is not None:
-        try:
-            sound.play()
-        except:
-            pass
+# --record=PATH saves each run's seed and inputs; replay.py plays them back headless
+record_path = record_path_from_argv(sys.argv)
+recorder = InputRecorder(record_path) if record_path else None
+if recorder:
+    recorder.start(sim.seed)
 
 # Function to update and draw the background
 def update_background(time):
-    # Draw the gradient background
-    screen.blit(background, (0, 0))
-    
-    # Update and draw stars with twinkling effect
-    for star in stars:
-        x, y, size, base_brightness, twinkle_speed, twinkle_offset = star
-        # Calculate twinkling effect
-        brightness = base_brightness + int(50 * math.sin(time * twinkle_speed + twinkle_offset))
-        brightness = max(min(brightness, 255), 50)  # Keep brightness in valid range
-        
-        # Draw the star
-        pygame.draw.circle(screen, (brightness, brightness, brightness), (int(x), int(y)), size)
+    # The gradient background itself is restored by the renderer
+    # Draw stars with twinkling effect
+    renderer.extend(starfield.draw(screen, time, dirty=renderer.enabled))
+
+# Sounds and effects for the events the sim reports each step
+def handle_sim_events(events):
+    for event in events:
+        if event == "boost":
+            # Create boost jump particles
+            particles.emit(sim.player_pos[0], sim.player_pos[1] + player_radius, 20)
+            sounds.trigger("boost")
+        elif event == "jump":
+            sounds.trigger("jump")
+        elif event == "land":
+            # Play landing sound for new platforms
+            sounds.trigger("land")
+        elif event == "game_over":
+            sounds.trigger("game_over")
+            if recorder:
+                recorder.finish(sim)
+            sounds.stop_music()  # Stop background music
 
 # Game loop
 def main():
-    global player_velocity_y, score, game_over, boost_jumps, on_ground, visited_platforms, player_pos, particles
     global show_sound_status, sound_status_timer, sound_enabled
     
     running = True
     time_passed = 0
+    timestep = FixedTimestep()
+    boost_pressed = False  # Held until the next sim step consumes it
+    scrolled = False
     while running:
+        profiler.begin_frame()
         time_passed += 0.1  # Increment time for animations
+        assets.poll()  # Swap in any sounds that finished loading
         
         # Event handling
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
             if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_r and game_over:
+                if event.key == pygame.K_r and sim.game_over:
                     restart_game()
-                # Boost jump with limited uses
-                if event.key == pygame.K_SPACE and not game_over and boost_jumps > 0 and not on_ground:
-                    player_velocity_y = -JUMP_POWER
-                    boost_jumps -= 1
-                    
-                    # Create boost jump particles
-                    for _ in range(20):
-                        particles.append(Particle(player_pos[0], player_pos[1] + player_radius))
-                    
-                    # Play boost sound
-                    play_sound(boost_sound)
+                # Boost jump, applied by the sim on its next step
+                if event.key == pygame.K_SPACE:
+                    boost_pressed = True
+                # Toggle the frame timing overlay
+                if event.key == TOGGLE_KEY:
+                    profiler.toggle()
+                    renderer.invalidate()
                 
                 # Toggle sound with M key
                 if event.key == pygame.K_m:
                     sound_enabled = not sound_enabled
                     show_sound_status = True
                     sound_status_timer = 180
-                    
-                    if sound_enabled:
-                        try:
-                            pygame.mixer.music.play(-1)
-                        except:
-                            pass
-                    else:
-                        try:
-                            pygame.mixer.music.stop()
-                        except:
-                            pass
+                    sounds.set_enabled(sound_enabled)
         
-        if not game_over:
-            # Player movement
-            keys = pygame.key.get_pressed()
-            if keys[pygame.K_LEFT]:
-                player_pos[0] -= PLAYER_SPEED
-            if keys[pygame.K_RIGHT]:
-                player_pos[0] += PLAYER_SPEED
-            
-            # Wrap around screen edges (teleport from one side to the other)
-            if player_pos[0] - player_radius > WIDTH:
-                player_pos[0] = -player_radius
-            elif player_pos[0] + player_radius < 0:
-                player_pos[0] = WIDTH + player_radius
-            
-            # Apply gravity
-            player_velocity_y += GRAVITY
-            player_pos[1] += player_velocity_y
-            
-            # Reset on_ground status
-            on_ground = False
-            
-            # Check for platform collisions (only when falling)
-            if player_velocity_y > 0:
-                for platform in platforms:
-                    # Check if the bottom of the ball is touching the platform
-                    if (player_pos[1] + player_radius >= platform.top and 
-                        player_pos[1] + player_radius <= platform.top + 15 and  # More forgiving collision
-                        player_pos[0] + player_radius > platform.left + 5 and    # More forgiving collision
-                        player_pos[0] - player_radius < platform.right - 5):      # More forgiving collision
-                        player_pos[1] = platform.top - player_radius
-                        player_velocity_y = -JUMP_POWER
-                        on_ground = True
-                        
-                        # Play jump sound
-                        play_sound(jump_sound)
-                        
-                        # Only increment score for platforms not visited before
-                        platform_id = id(platform)
-                        if platform_id not in visited_platforms:
-                            visited_platforms.add(platform_id)
-                            score += 1
-                            
-                            # Play landing sound for new platforms
-                            play_sound(land_sound)
-                            
-                            # Replenish boost jumps when landing on a new platform
-                            if score % 5 == 0:  # Every 5 platforms, get a boost jump
-                                boost_jumps = min(boost_jumps + 1, 3)  # Max 3 boost jumps
-            
-            # Check if player fell off the bottom
-            if player_pos[1] - player_radius > HEIGHT:
-                game_over = True
-                # Play game over sound
-                play_sound(game_over_sound)
-                try:
-                    pygame.mixer.music.stop()  # Stop background music
-                except:
-                    pass
+        profiler.lap("events")
+        
+        # Run as many fixed steps as the elapsed frame time covers
+        keys = pygame.key.get_pressed()
+        inputs = 0
+        if keys[pygame.K_LEFT]:
+            inputs |= INPUT_LEFT
+        if keys[pygame.K_RIGHT]:
+            inputs |= INPUT_RIGHT
+        for _ in range(timestep.advance(clock.get_time() / 1000)):
+            if boost_pressed:
+                inputs |= INPUT_BOOST
+                boost_pressed = False
+            if recorder and not sim.game_over:
+                recorder.record(inputs)
+            handle_sim_events(sim.step(inputs))
+            inputs &= ~INPUT_BOOST
             
-            # Scroll the screen when player reaches upper half
-            if player_pos[1] < HEIGHT // 2:
-                scroll_speed = 4  # Slightly slower scrolling
-                player_pos[1] += scroll_speed
-                for platform in platforms:
-                    platform.y += scroll_speed
-                    # Remove platforms that have gone off screen
-                    if platform.top > HEIGHT:
-                        # Remove from visited set if it exists there
-                        platform_id = id(platform)
-                        if platform_id in visited_platforms:
-                            visited_platforms.remove(platform_id)
-                        
-                        platforms.remove(platform)
-                        # Create a new platform at the top
-                        x = random.randint(50, WIDTH - PLATFORM_WIDTH - 50)
-                        y = min([p.y for p in platforms]) - PLATFORM_GAP  # Place consistently above highest platform
-                        platforms.append(pygame.Rect(x, y, PLATFORM_WIDTH, PLATFORM_HEIGHT))
-                
-                # Scroll stars with parallax effect (stars move slower than platforms)
-                for star in stars:
-                    star[1] += scroll_speed * 0.7  # Stars move at 70% of platform speed
-                    if star[1] > HEIGHT:
-                        star[1] = 0
-                        star[0] = random.randint(0, WIDTH)
+            # Scroll stars with parallax effect (stars move slower than platforms)
+            if sim.scrolled:
+                scrolled = True
+                starfield.scroll(sim.scrolled)
+        profiler.lap("update")
+        sounds.flush()  # One voice per sound triggered during those steps
+        profiler.lap("sound")
         
         # Update particles
-        for particle in particles[:]:
-            particle.update()
-            if particle.lifetime <= 0:
-                particles.remove(particle)
+        particles.update()
+        profiler.lap("particles")
         
-        # Drawing - start with background
+        # Drawing - start with background; scrolling moves every platform and
+        # the game over overlay is translucent, so both need the full screen
+        renderer.begin(full=scrolled or sim.game_over)
+        scrolled = False
         update_background(time_passed)
+        profiler.lap("background")
         
         # Draw particles behind player
-        for particle in particles:
-            particle.draw(screen)
+        renderer.add(particles.draw(screen))
         
         # Draw player as a ball
-        pygame.draw.circle(screen, RED, (int(player_pos[0]), int(player_pos[1])), player_radius)
+        sprites.add("ball", (int(sim.player_pos[0]), int(sim.player_pos[1])))
         
         # Add a shine effect to the ball
-        shine_pos = (int(player_pos[0] - player_radius * 0.3), int(player_pos[1] - player_radius * 0.3))
-        shine_radius = int(player_radius * 0.25)
-        pygame.draw.circle(screen, (255, 200, 200), shine_pos, shine_radius)
+        sprites.add("shine", (int(sim.player_pos[0] - player_radius * 0.3), int(sim.player_pos[1] - player_radius * 0.3)))
+        renderer.extend(sprites.flush(screen, dirty=renderer.enabled))  # Platforms go on top of the ball
         
-        # Draw platforms with different colors based on height
-        for platform in platforms:
+        # Draw platforms with different colors based on height (static unless scrolling)
+        for platform in sim.platforms:
             # Ensure color values are integers between 0-255
             color_value = max(0, min(255, int(255 - (platform.y * 255 // HEIGHT))))
             platform_color = (0, color_value, color_value)
@@ -339,80 +247,67 @@ def main():
                             (platform.left, platform.top), (platform.right, platform.top), 2)
         
         # Draw score
-        score_text = font.render(f"Score: {score}", True, WHITE)
-        screen.blit(score_text, (10, 10))
+        score_text = text_cache.render(font, f"Score: {sim.score}", True, WHITE)
+        sprites.blit(score_text, (10, 10))
         
         # Draw boost jumps remaining
-        boost_text = font.render("Boosts:", True, WHITE)
-        screen.blit(boost_text, (WIDTH - 120, 20))
+        boost_text = text_cache.render(font, "Boosts:", True, WHITE)
+        sprites.blit(boost_text, (WIDTH - 120, 20))
         
-        for i in range(boost_jumps):
+        for i in range(sim.boost_jumps):
             # Draw boost indicators as small glowing orbs
-            boost_x = WIDTH - 30 - i*25
-            boost_y = 20
-            # Outer glow
-            pygame.draw.circle(screen, (255, 200, 100), (boost_x + 10, boost_y + 10), 12)
-            # Inner core
-            pygame.draw.circle(screen, ORANGE, (boost_x + 10, boost_y + 10), 8)
-            # Shine
-            pygame.draw.circle(screen, (255, 255, 200), (boost_x + 7, boost_y + 7), 3)
+            sprites.add("boost_orb", (WIDTH - 30 - i*25, 20))
         
         # Draw instructions
-        if score < 3:
-            instructions = font.render("Use LEFT/RIGHT to move, SPACE for boost jump", True, YELLOW)
-            screen.blit(instructions, (WIDTH // 2 - 250, 40))
+        if sim.score < 3:
+            instructions = text_cache.render(font, "Use LEFT/RIGHT to move, SPACE for boost jump", True, YELLOW)
+            sprites.blit(instructions, (WIDTH // 2 - 250, 40))
             
             # Add sound control instructions
-            sound_instructions = font.render("Press M to toggle sound", True, YELLOW)
-            screen.blit(sound_instructions, (WIDTH // 2 - 100, 70))
+            sound_instructions = text_cache.render(font, "Press M to toggle sound", True, YELLOW)
+            sprites.blit(sound_instructions, (WIDTH // 2 - 100, 70))
         
         # Show sound status when toggled
         if show_sound_status:
             status = "ON" if sound_enabled else "OFF"
-            status_text = font.render(f"Sound: {status}", True, WHITE)
-            screen.blit(status_text, (WIDTH // 2 - 50, HEIGHT - 40))
+            status_text = text_cache.render(font, f"Sound: {status}", True, WHITE)
+            sprites.blit(status_text, (WIDTH // 2 - 50, HEIGHT - 40))
             sound_status_timer -= 1
             if sound_status_timer <= 0:
                 show_sound_status = False
+        renderer.extend(sprites.flush(screen, dirty=renderer.enabled))
         
         # Draw game over
-        if game_over:
-            # Semi-transparent overlay
-            overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, 128))
-            screen.blit(overlay, (0, 0))
-            
-            game_over_text = font.render("GAME OVER! Press R to restart", True, WHITE)
-            screen.blit(game_over_text, (WIDTH // 2 - 180, HEIGHT // 2))
-            final_score = font.render(f"Final Score: {score}", True, WHITE)
-            screen.blit(final_score, (WIDTH // 2 - 80, HEIGHT // 2 + 40))
+        if sim.game_over:
+            # Semi-transparent overlay and text, from cached surfaces
+            final_score_label.set_text(f"Final Score: {sim.score}")
+            game_over_screen.draw(screen)
         
-        pygame.display.flip()
+        renderer.add(profiler.draw(screen))
+        profiler.lap("draw")
+        renderer.present()
+        profiler.lap("flip")
+        profiler.end_frame()
         clock.tick(FPS)
     
+    profiler.close()
+    sounds.report()
+    sim.close()
+    if recorder:
+        recorder.finish(sim)
+        recorder.close()
     pygame.quit()
     sys.exit()
 
 def restart_game():
-    global player_pos, platforms, player_velocity_y, score, game_over, boost_jumps, on_ground, visited_platforms, particles
-    player_pos = [WIDTH // 2, HEIGHT - 100]
-    platforms = []
-    player_velocity_y = 0
-    score = 0
-    game_over = False
-    boost_jumps = 3
-    on_ground = False
-    visited_platforms = set()  # Reset visited platforms
-    particles = []  # Clear particles
-    create_platforms()
+    sim.reset(sim.level.next_seed())  # A seed whose first platforms the worker has already built
+    if recorder:
+        recorder.start(sim.seed)
+    particles.clear()
+    renderer.invalidate()
     
     # Restart music if it was stopped
-    if sound_enabled:
-        try:
-            if not pygame.mixer.music.get_busy():
-                pygame.mixer.music.play(-1)
-        except:
-            pass
+    sounds.play_music()
 
 if __name__ == "__main__":
     main()
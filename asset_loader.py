@@ -0,0 +1,120 @@
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+
+class AssetLoader:
+    """Loads sounds, images and music on a background thread.
+
+    Files are read and decoded on the worker; anything that touches the
+    display or the music stream runs on the main thread inside poll(), which
+    the game calls once per frame. Until an asset is ready get() returns None,
+    so the game can start straight away and pick assets up as they arrive.
+    When the last pending asset finishes, a per-asset timing report is printed
+    and compared against the startup budget (in seconds).
+    """
+
+    def __init__(self, budget=None, workers=1):
+        self.budget = budget
+        self.assets = {}
+        self.timings = {}  # Seconds each asset spent loading on the worker
+        self.errors = {}
+        self.ready_time = None  # Seconds from start until the last asset was ready
+        self._pending = {}
+        self._start = time.perf_counter()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="asset-loader")
+
+    def get(self, name, default=None):
+        return self.assets.get(name, default)
+
+    def done(self):
+        return not self._pending
+
+    def load(self, name, load, finish=None, on_ready=None):
+        """Run load() on the worker, then finish(asset) and on_ready(asset) on the main thread."""
+        future = self._executor.submit(self._timed, load)
+        self._pending[name] = (future, finish, on_ready)
+
+    def sound(self, name, path, volume=None, on_ready=None):
+        def load():
+            sound = pygame.mixer.Sound(path)
+            if volume is not None:
+                sound.set_volume(volume)
+            return sound
+        self.load(name, load, on_ready=on_ready)
+
+    def image(self, name, path, size=None, on_ready=None):
+        def load():
+            image = pygame.image.load(path)
+            if size is not None:
+                image = pygame.transform.scale(image, size)
+            return image
+        self.load(name, load, finish=_convert, on_ready=on_ready)
+
+    def music(self, name, path, on_ready=None):
+        """Read the track on the worker and hand it to pygame.mixer.music when ready."""
+        def load():
+            with open(path, "rb") as f:
+                return io.BytesIO(f.read())
+        def finish(data):
+            pygame.mixer.music.load(data, path.rsplit(".", 1)[-1])
+            return path
+        self.load(name, load, finish=finish, on_ready=on_ready)
+
+    def poll(self):
+        """Swap in every asset that finished since the last call; returns how many did."""
+        if not self._pending:
+            return 0
+        finished = 0
+        for name, (future, finish, on_ready) in list(self._pending.items()):
+            if not future.done():
+                continue
+            del self._pending[name]
+            finished += 1
+            try:
+                asset, seconds = future.result()
+                if finish is not None:
+                    asset = finish(asset)
+            except Exception as e:
+                print(f"Error loading {name}: {e}")
+                self.errors[name] = e
+                continue
+            self.assets[name] = asset
+            self.timings[name] = seconds
+            if on_ready is not None:
+                on_ready(asset)
+        if not self._pending:
+            self.ready_time = time.perf_counter() - self._start
+            self.report()
+        return finished
+
+    def wait(self):
+        """Block until everything is loaded (for tools and benchmarks)."""
+        while self._pending:
+            self.poll()
+            time.sleep(0.001)
+
+    def report(self):
+        budget = f" (budget {self.budget:.2f}s)" if self.budget is not None else ""
+        print(f"Assets ready in {self.ready_time:.3f}s{budget}:")
+        for name, seconds in sorted(self.timings.items(), key=lambda item: -item[1]):
+            print(f"  {name:<16}{seconds * 1000:8.1f} ms")
+        for name in self.errors:
+            print(f"  {name:<16}  failed")
+        if self.budget is not None and self.ready_time > self.budget:
+            print(f"Warning: asset loading took {self.ready_time - self.budget:.3f}s longer than the startup budget")
+
+    @staticmethod
+    def _timed(load):
+        start = time.perf_counter()
+        asset = load()
+        return asset, time.perf_counter() - start
+
+
+def _convert(image):
+    # Converting needs the display, so it happens on the main thread
+    if pygame.display.get_surface() is None:
+        return image
+    return image.convert_alpha() if image.get_flags() & pygame.SRCALPHA else image.convert()
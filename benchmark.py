@@ -0,0 +1,293 @@
+import json
+import os
+import platform
+import random
+import runpy
+import subprocess
+import sys
+import time
+
+# Must be set before pygame initializes its video and audio drivers
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ["SDL_AUDIODRIVER"] = "dummy"
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+from platformer_sim import FixedTimestep
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_FRAMES = 1800
+DRAW_FUNCTIONS = ("rect", "circle", "ellipse", "polygon", "line", "lines", "aaline", "aalines", "arc")
+
+
+# Scripted input: each script takes the frame number and returns
+# (keys pressed this frame, keys held down this frame)
+
+def platformer_script(frame):
+    pressed = []
+    if frame % 97 == 0:
+        pressed.append(pygame.K_SPACE)
+    if frame % 400 == 0:
+        pressed.append(pygame.K_r)
+    if frame % 70 < 25:
+        return pressed, {pygame.K_RIGHT}
+    if frame % 70 > 50:
+        return pressed, {pygame.K_LEFT}
+    return pressed, set()
+
+
+def shooter_script(frame):
+    pressed = []
+    if frame % 6 == 0:
+        pressed.append(pygame.K_SPACE)
+    if frame % 60 == 0:
+        pressed.append(pygame.K_r)
+    return pressed, {pygame.K_LEFT} if frame % 120 < 60 else {pygame.K_RIGHT}
+
+
+def flappy_script(frame):
+    return [pygame.K_SPACE] if frame % 28 == 1 else [], set()
+
+
+def snake_script(frame):
+    # Zigzag: one row down, then back across, so the snake never runs into itself
+    turns = {0: pygame.K_DOWN, 1: pygame.K_LEFT, 30: pygame.K_DOWN, 31: pygame.K_RIGHT}
+    key = turns.get(frame % 60)
+    return [key] if key else [], set()
+
+
+GAMES = {
+    "angel": ("angel/platformer_game.py", platformer_script),
+    "space_shooter": ("space_shooter.py", shooter_script),
+    "flappy": ("flappy_game.py", flappy_script),
+    "snake": ("snake_game.py", snake_script),
+}
+
+
+class KeyState:
+    def __init__(self, held):
+        self.held = held
+
+    def __getitem__(self, key):
+        return key in self.held
+
+
+class Driver:
+    """Runs a game's own loop for a fixed number of frames without a human.
+
+    pygame is patched before the game is imported: events and held keys come
+    from the script, the clock never waits, and the screen returned by
+    set_mode is a TimedSurface. Time spent inside drawing, blitting, text
+    rendering and presenting counts as render time; the rest of each frame
+    (events, game logic) counts as update time. Games that run a
+    FixedTimestep take as many sim steps as it hands out, which need not be
+    one per frame, so those are counted as they are taken.
+    """
+
+    def __init__(self, frames, script):
+        self.frames = frames
+        self.script = script
+        self.frame = 0
+        self.render_time = 0.0
+        self.busy_time = 0.0
+        self.frame_start = None
+        self.held = set()
+        self.fixed_steps = None  # Sim steps handed out by FixedTimestep, once the game uses one
+        self.install()
+
+    def timed(self, function):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.render_time += time.perf_counter() - start
+        return wrapper
+
+    def install(self):
+        driver = self
+
+        class TimedSurface(pygame.Surface):
+            blit = driver.timed(pygame.Surface.blit)
+            blits = driver.timed(pygame.Surface.blits)
+            fill = driver.timed(pygame.Surface.fill)
+
+        class TimedFont(pygame.font.Font):
+            render = driver.timed(pygame.font.Font.render)
+
+        class Clock:
+            def __init__(self):
+                self.time = 0
+
+            def tick(self, framerate=0):
+                self.time = 1000 / framerate if framerate else 0
+                return self.time
+
+            def get_time(self):
+                return self.time
+
+            def get_fps(self):
+                return 1000 / self.time if self.time else 0.0
+
+        set_mode, sys_font = pygame.display.set_mode, pygame.font.SysFont
+
+        def timed_set_mode(size=(0, 0), *args, **kwargs):
+            display = set_mode(size, *args, **kwargs)
+            return TimedSurface(display.get_size(), 0, display)
+
+        def timed_sys_font(name, size, bold=False, italic=False, constructor=None):
+            def construct(path, size, bold, italic):
+                font = TimedFont(path, size)
+                font.set_bold(bold)
+                font.set_italic(italic)
+                return font
+            return sys_font(name, size, bold, italic, construct)
+
+        pygame.display.set_mode = timed_set_mode
+        pygame.display.flip = self.present(pygame.display.flip)
+        pygame.display.update = self.present(pygame.display.update)
+        pygame.font.Font = TimedFont
+        pygame.font.SysFont = timed_sys_font
+        pygame.time.Clock = Clock
+        pygame.event.get = self.events
+        pygame.key.get_pressed = lambda: KeyState(self.held)
+
+        advance = FixedTimestep.advance
+
+        def counted_advance(timestep, elapsed):
+            steps = advance(timestep, elapsed)
+            driver.fixed_steps = (driver.fixed_steps or 0) + steps
+            return steps
+        FixedTimestep.advance = counted_advance
+        for name in DRAW_FUNCTIONS:
+            setattr(pygame.draw, name, self.timed(getattr(pygame.draw, name)))
+
+    def present(self, function):
+        timed = self.timed(function)
+
+        def wrapper(*args, **kwargs):
+            result = timed(*args, **kwargs)
+            now = time.perf_counter()
+            self.busy_time += now - self.frame_start
+            self.frame_start = now
+            self.frame += 1
+            return result
+        return wrapper
+
+    def events(self, *args, **kwargs):
+        if self.frame_start is None:
+            self.frame_start = time.perf_counter()  # Import and setup time is not part of any frame
+        if self.frame >= self.frames:
+            return [pygame.event.Event(pygame.QUIT)]
+        pressed, self.held = self.script(self.frame)
+        return [pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode="") for key in pressed]
+
+    def run(self, path):
+        """Run the game until the frame budget is spent, restarting it whenever it exits."""
+        sys.path.insert(0, os.path.dirname(os.path.abspath(path)))
+        runs = 0
+        while self.frame < self.frames:
+            random.seed(runs)
+            self.frame_start = None
+            first = self.frame
+            try:
+                runpy.run_path(path, run_name="__main__")
+            except SystemExit:
+                pass
+            runs += 1
+            if self.frame == first:
+                raise RuntimeError(f"{path} exited without drawing a frame")
+        return runs
+
+
+def peak_memory_mb():
+    try:
+        import resource
+    except ImportError:  # Not available on Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def benchmark_game(name, frames):
+    """Drive one game in this process and return its results."""
+    path, script = GAMES[name]
+    driver = Driver(frames, script)
+    runs = driver.run(path)
+    update_time = driver.busy_time - driver.render_time
+    # Games without a FixedTimestep update once per frame
+    steps = driver.frame if driver.fixed_steps is None else driver.fixed_steps
+    return {
+        "game": name,
+        "frames": driver.frame,
+        "runs": runs,
+        "frames_per_s": driver.frame / driver.busy_time,
+        "sim_steps": steps,
+        "sim_steps_per_s": steps / update_time,
+        "render_fps": driver.frame / driver.render_time,
+        "update_ms": update_time / driver.frame * 1000,
+        "render_ms": driver.render_time / driver.frame * 1000,
+        "peak_memory_mb": peak_memory_mb(),
+    }
+
+
+def machine_info():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "commit": commit,
+    }
+
+
+def main(argv):
+    frames = DEFAULT_FRAMES
+    out = "benchmark_results.json"
+    games = []
+    for arg in argv:
+        if arg.startswith("--frames="):
+            frames = int(arg.split("=", 1)[1])
+        elif arg.startswith("--out="):
+            out = arg.split("=", 1)[1]
+        elif arg in GAMES:
+            games.append(arg)
+        else:
+            print(f"Unknown argument {arg}; games are {', '.join(GAMES)}")
+            return 1
+
+    results = []
+    for name in games or list(GAMES):
+        # One process per game keeps peak memory and module state separate
+        child = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", name, str(frames)],
+                               cwd=ROOT, capture_output=True, text=True)
+        if child.returncode != 0:
+            print(f"{name} failed:\n{child.stderr}")
+            return 1
+        result = json.loads(child.stdout.strip().splitlines()[-1])
+        results.append(result)
+        print(f"{name:<14}{result['sim_steps_per_s']:>12.0f} steps/s{result['render_fps']:>10.0f} render fps"
+              f"{result['frames_per_s']:>10.0f} frames/s{result['peak_memory_mb'] or 0:>8.1f} MB peak")
+
+    with open(out, "w") as f:
+        json.dump({"machine": machine_info(), "frames": frames, "time": time.time(), "results": results}, f, indent=2)
+    print(f"Results written to {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    # python benchmark.py [--frames=N] [--out=PATH] [game ...]
+    if len(sys.argv) == 4 and sys.argv[1] == "--child":
+        os.chdir(ROOT)  # Games load sounds/ and images/ relative to the repository root
+        result = benchmark_game(sys.argv[2], int(sys.argv[3]))
+        print(json.dumps(result))
+    else:
+        sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,61 @@
+import pygame
+
+
+class DirtyRectRenderer:
+    """Redraws and presents only the parts of the screen that changed.
+
+    Everything that moves or changes is drawn each frame and its rect passed
+    to add(). At the start of the next frame those rects are painted back with
+    the background, and present() pushes old and new rects together through
+    pygame.display.update(). Anything static (platforms while not scrolling)
+    may be redrawn without add(): it lands on the same pixels it already had.
+
+    A frame falls back to a full background blit and flip() when the caller
+    asks for it (scrolling, translucent overlays) or when the dirty area would
+    cover more than full_ratio of the screen anyway. With enabled=False every
+    frame is a full frame, which is the game's original behaviour.
+    """
+
+    def __init__(self, screen, background, enabled=True, full_ratio=0.5):
+        self.screen = screen
+        self.background = background
+        self.enabled = enabled
+        self.full_ratio = full_ratio
+        self.dirty = []  # Rects drawn this frame
+        self.previous = []  # Rects drawn last frame, erased at the start of this one
+        self.full = True  # First frame always draws everything
+
+    def invalidate(self):
+        """Force the next frame to be redrawn and presented in full."""
+        self.full = True
+
+    def begin(self, full=False):
+        self.full = self.full or full or not self.enabled
+        if self.full:
+            self.screen.blit(self.background, (0, 0))
+        else:
+            for rect in self.previous:
+                self.screen.blit(self.background, rect, rect)
+
+    def add(self, rect):
+        if self.enabled and rect is not None:
+            self.dirty.append(rect)
+        return rect
+
+    def extend(self, rects):
+        if self.enabled and rects:
+            self.dirty.extend(rects)
+
+    def present(self):
+        if not self.full:
+            rects = self.previous + self.dirty
+            area = sum(rect.width * rect.height for rect in rects)
+            if area > self.full_ratio * self.screen.get_width() * self.screen.get_height():
+                self.full = True
+        if self.full:
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects)
+        self.previous = self.dirty
+        self.dirty = []
+        self.full = False
@@ -0,0 +1,157 @@
+import numpy as np
+
+
+class Archetype:
+    """Entities that share the same components, one contiguous NumPy array per component.
+
+    Live entities occupy rows 0..len-1 in spawn order. Reading a component
+    (archetype["x"]) gives a view of just those rows, so systems work on a
+    whole archetype at once. Removal compacts the arrays in one pass and keeps
+    the order, which games rely on for "first bullet wins" style rules.
+
+    With fixed set the archetype is a pool: every array is allocated up
+    front, spawns past capacity are dropped (and counted), and removal
+    compacts through preallocated scratch arrays, so nothing is allocated
+    per entity once the game is running. Systems build remove()'s mask in
+    mask() instead of a fresh array. Spawning is O(1) per entity; removal
+    is one O(live entities) pass per call however many die, since keeping
+    spawn order rules out swapping the last entity into the hole.
+    high_water is the most entities ever alive at once, for sizing the pool.
+    """
+
+    def __init__(self, name, components, capacity=64, fixed=False):
+        self.name = name
+        self.count = 0
+        self.capacity = capacity
+        self.fixed = fixed
+        self.high_water = 0
+        self.dropped = 0
+        self.columns = {component: np.zeros(capacity, dtype=dtype) for component, dtype in components.items()}
+        self._keep = np.zeros(capacity, dtype=bool)
+        self._mask = np.zeros(capacity, dtype=bool)
+        self._scratch = {np.dtype(dtype): np.zeros(capacity, dtype=dtype) for dtype in components.values()}
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, component):
+        return self.columns[component][:self.count]
+
+    def __setitem__(self, component, values):
+        self.columns[component][:self.count] = values
+
+    def _grow(self, needed):
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        for component, column in self.columns.items():
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self.count] = column[:self.count]
+            self.columns[component] = grown
+        self._keep = np.zeros(capacity, dtype=bool)
+        self._mask = np.zeros(capacity, dtype=bool)
+        self._scratch = {dtype: np.zeros(capacity, dtype=dtype) for dtype in self._scratch}
+        self.capacity = capacity
+
+    def spawn(self, **values):
+        """Add one entity and return its row, or None if a fixed pool is full; components not given start at zero."""
+        if self.count == self.capacity:
+            if self.fixed:
+                self.dropped += 1
+                return None
+            self._grow(self.count + 1)
+        row = self.count
+        for component, column in self.columns.items():
+            column[row] = values.get(component, 0)
+        self.count += 1
+        self.high_water = max(self.high_water, self.count)
+        return row
+
+    def spawn_many(self, count, **values):
+        """Add `count` entities and return how many fit; each value is a scalar or an array of length count."""
+        if self.count + count > self.capacity:
+            if self.fixed:
+                self.dropped += self.count + count - self.capacity
+                count = self.capacity - self.count
+            else:
+                self._grow(self.count + count)
+        rows = slice(self.count, self.count + count)
+        for component, column in self.columns.items():
+            value = values.get(component, 0)
+            column[rows] = value[:count] if np.ndim(value) else value
+        self.count += count
+        self.high_water = max(self.high_water, self.count)
+        return count
+
+    def mask(self):
+        """A cleared boolean array with one entry per live entity, to fill in (or pass as out=) for remove().
+
+        It is the same preallocated buffer every time, so finish with one before asking for the next.
+        """
+        mask = self._mask[:self.count]
+        mask[:] = False
+        return mask
+
+    def remove(self, dead):
+        """Remove the entities where the boolean mask `dead` (one entry per live row) is set."""
+        dead = np.asarray(dead, dtype=bool)
+        if not dead.any():
+            return
+        keep = np.logical_not(dead, out=self._keep[:self.count])
+        alive = self.count - int(np.count_nonzero(dead))
+        for column in self.columns.values():
+            scratch = self._scratch[column.dtype][:alive]
+            np.compress(keep, column[:self.count], out=scratch)
+            column[:alive] = scratch
+        self.count = alive
+
+    def clear(self):
+        self.count = 0
+
+
+class World:
+    """Archetypes plus the systems that run over them once per frame.
+
+    A system is a plain function taking the world. update() runs them in the
+    order they were added; with a FrameProfiler attached, each system's time
+    is lapped under its own name, so any game gets per-system timings.
+    """
+
+    def __init__(self, profiler=None):
+        self.archetypes = {}
+        self.systems = []
+        self.profiler = profiler
+
+    def __getitem__(self, name):
+        return self.archetypes[name]
+
+    def archetype(self, name, capacity=64, fixed=False, **components):
+        archetype = Archetype(name, components, capacity, fixed)
+        self.archetypes[name] = archetype
+        return archetype
+
+    def add_system(self, name, system):
+        self.systems.append((name, system))
+
+    def system_names(self):
+        return [name for name, _ in self.systems]
+
+    def update(self, names=None):
+        """Run every system, or just those whose names are given."""
+        profiler = self.profiler
+        for name, system in self.systems:
+            if names is not None and name not in names:
+                continue
+            system(self)
+            if profiler:
+                profiler.lap(name)
+
+    def clear(self):
+        for archetype in self.archetypes.values():
+            archetype.clear()
+
+    def report(self):
+        """Print each archetype's high-water mark against its capacity, for tuning pool sizes."""
+        print("Entities: " + ", ".join(
+            f"{a.name} peak {a.high_water}/{a.capacity}" + (f" ({a.dropped} dropped)" if a.dropped else "")
+            for a in self.archetypes.values()))
@@ -1,5 +1,12 @@
 import pygame
 import random
+import sys
+
+import numpy as np
+
+from ecs import World
+from frame_profiler import TOGGLE_KEY, profiler_from_argv
+from text_cache import TextCache
 
 pygame.init()
 WIDTH = 400
@@ -19,51 +26,83 @@ GREEN = (0, 255, 0)
 YELLOW = (255, 255, 0)
 WHITE = (255, 255, 255)
 
-class Bird:
-    def __init__(self):
-        self.x = WIDTH // 3
-        self.y = HEIGHT // 2
-        self.velocity = 0
-        self.size = 30
-        
-    def jump(self):
-        self.velocity = JUMP_STRENGTH
-        
-    def update(self):
-        self.velocity += GRAVITY
-        self.y += self.velocity
-        
-    def draw(self):
-        pygame.draw.circle(screen, YELLOW, (self.x, int(self.y)), self.size)
-
-class Pipe:
-    def __init__(self):
-        self.gap_y = random.randint(150, HEIGHT - 150)
-        self.x = WIDTH
-        self.width = 50
-        
-    def update(self):
-        self.x -= PIPE_SPEED
-        
-    def draw(self):
-        pygame.draw.rect(screen, GREEN, (self.x, 0, self.width, self.gap_y - PIPE_GAP//2))
-        pygame.draw.rect(screen, GREEN, (self.x, self.gap_y + PIPE_GAP//2, self.width, HEIGHT))
-        
-    def collides_with(self, bird):
-        bird_rect = pygame.Rect(bird.x - bird.size, bird.y - bird.size, bird.size * 2, bird.size * 2)
-        top_pipe = pygame.Rect(self.x, 0, self.width, self.gap_y - PIPE_GAP//2)
-        bottom_pipe = pygame.Rect(self.x, self.gap_y + PIPE_GAP//2, self.width, HEIGHT)
-        return bird_rect.colliderect(top_pipe) or bird_rect.colliderect(bottom_pipe)
+# Fonts are loaded once; rendered text is cached across frames
+score_font = pygame.font.Font(None, 36)
+message_font = pygame.font.Font(None, 48)
+text_cache = TextCache()
+
+BIRD_SIZE = 30
+PIPE_WIDTH = 50
+
+# The bird and the pipes are entities; every system runs over whole arrays
+world = World()
+birds = world.archetype("birds", capacity=1, x=np.int32, y=np.float64, velocity=np.float64)
+pipes = world.archetype("pipes", x=np.int32, gap_y=np.int32)
+score = 0
+crashed = False
+
+def spawn_pipe():
+    pipes.spawn(x=WIDTH, gap_y=random.randint(150, HEIGHT - 150))
+
+def apply_gravity(world):
+    birds["velocity"] += GRAVITY
+    birds["y"] += birds["velocity"]
+
+def move_pipes(world):
+    if pipes["x"][-1] < WIDTH - 200:
+        spawn_pipe()
+    pipes["x"] -= PIPE_SPEED
+
+def collide(world):
+    global crashed
+    x, y = pipes["x"], pipes["gap_y"]
+    for bird_x, bird_y in zip(birds["x"].tolist(), birds["y"].tolist()):
+        bird = pygame.Rect(bird_x - BIRD_SIZE, bird_y - BIRD_SIZE, BIRD_SIZE * 2, BIRD_SIZE * 2)
+        # Rect.colliderect against each pipe's top and bottom halves
+        across = (bird.left < x + PIPE_WIDTH) & (bird.right > x)
+        # The top half spans 0..gap top and the bottom half is HEIGHT tall, as the baseline's Rects
+        top = (bird.top < y - PIPE_GAP // 2) & (bird.bottom > 0)
+        bottom = (bird.bottom > y + PIPE_GAP // 2) & (bird.top < y + PIPE_GAP // 2 + HEIGHT)
+        if (across & (top | bottom)).any():
+            crashed = True
+
+def score_pipes(world):
+    global score
+    pipes.remove(np.less_equal(pipes["x"], -PIPE_WIDTH, out=pipes.mask()))
+    for bird_x in birds["x"].tolist():
+        score += int((pipes["x"] + PIPE_WIDTH == bird_x).sum())
+
+def draw(world):
+    screen.fill(SKY_BLUE)
+    for x, y in zip(birds["x"].tolist(), birds["y"].tolist()):
+        pygame.draw.circle(screen, YELLOW, (x, int(y)), BIRD_SIZE)
+    for x, gap_y in zip(pipes["x"].tolist(), pipes["gap_y"].tolist()):
+        pygame.draw.rect(screen, GREEN, (x, 0, PIPE_WIDTH, gap_y - PIPE_GAP//2))
+        pygame.draw.rect(screen, GREEN, (x, gap_y + PIPE_GAP//2, PIPE_WIDTH, HEIGHT))
+
+world.add_system("gravity", apply_gravity)
+world.add_system("pipes", move_pipes)
+world.add_system("collision", collide)
+world.add_system("score", score_pipes)
+world.add_system("draw", draw)
+UPDATE_SYSTEMS = ["gravity", "pipes", "collision", "score"]
+
+profiler = profiler_from_argv(["events"] + world.system_names() + ["flip"], sys.argv)  # One phase per system
+world.profiler = profiler
 
 
 def main():
-    bird = Bird()
-    pipes = [Pipe()]
+    global score, crashed
+    world.clear()
+    birds.spawn(x=WIDTH // 3, y=HEIGHT // 2)
+    spawn_pipe()
     score = 0
+    crashed = False
     game_started = False
     
     running = True
     while running:
+        profiler.begin_frame()
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
@@ -71,46 +110,36 @@ def main():
                 if event.key == pygame.K_SPACE:
                     if not game_started:
                         game_started = True
-                    bird.jump()
+                    birds["velocity"] = JUMP_STRENGTH
+                if event.key == TOGGLE_KEY:
+                    profiler.toggle()
+        profiler.lap("events")
         
         if game_started:
-            bird.update()
-            
-            if pipes[-1].x < WIDTH - 200:
-                pipes.append(Pipe())
-            
-            for pipe in pipes:
-                pipe.update()
-                if pipe.collides_with(bird):
-                    running = False
-                    
-            pipes = [pipe for pipe in pipes if pipe.x > -pipe.width]
-            
-            for pipe in pipes:
-                if pipe.x + pipe.width == bird.x:
-                    score += 1
+            world.update(UPDATE_SYSTEMS)
+            if crashed:
+                running = False
         
         # Draw everything
-        screen.fill(SKY_BLUE)
-        bird.draw()
-        for pipe in pipes:
-            pipe.draw()
+        world.update(["draw"])
             
         # Display score
-        font = pygame.font.Font(None, 36)
-        score_text = font.render(str(score), True, WHITE)
+        score_text = text_cache.render(score_font, str(score), True, WHITE)
         screen.blit(score_text, (WIDTH//2, 50))
         
         # Show start message if game hasn't started
         if not game_started:
-            font = pygame.font.Font(None, 48)
-            text = font.render("Press SPACE to Start", True, WHITE)
+            text = text_cache.render(message_font, "Press SPACE to Start", True, WHITE)
             text_rect = text.get_rect(center=(WIDTH//2, HEIGHT//2))
             screen.blit(text, text_rect)
+        profiler.draw(screen)
         
         pygame.display.flip()
+        profiler.lap("flip")
+        profiler.end_frame()
         clock.tick(60)
     
+    profiler.close()
     print("Final Score: " +str(score))
     pygame.quit()
 
@@ -0,0 +1,115 @@
+import csv
+import time
+
+import numpy as np
+import pygame
+
+TOGGLE_KEY = pygame.K_F3  # Shows and hides the overlay in every game
+# The platformers' main loop, in the order its phases run
+PLATFORMER_PHASES = ["events", "physics", "collision", "scroll", "particles", "background", "draw", "flip"]
+# The angel platformer's loop, where "update" covers all of a frame's fixed sim steps
+FIXED_STEP_PHASES = ["events", "update", "sound", "particles", "background", "draw", "flip"]
+
+class FrameProfiler:
+    """Per-phase frame timing with a rolling percentile overlay and optional CSV trace.
+
+    Call begin_frame() at the top of the loop, lap(phase) after each phase
+    (time since the previous lap goes to that phase, and repeated laps in one
+    frame add up), and end_frame() after the flip. The overlay shows p50, p95
+    and p99 over the last `window` frames. With csv_path set, every frame's
+    timings are streamed to that file in milliseconds.
+    """
+
+    def __init__(self, phases, window=300, csv_path=None, refresh=15):
+        self.phases = list(phases)
+        self.index = {phase: i for i, phase in enumerate(self.phases)}
+        self.window = window
+        self.refresh = refresh  # Frames between overlay redraws
+        self.visible = False
+        self.frames = 0
+        # Columns: each phase, then busy (sum of phases), then the whole frame including idle time
+        self.history = np.zeros((window, len(self.phases) + 2))
+        self.current = np.zeros(len(self.phases))
+        self._last = self._last_end = time.perf_counter()
+        self._overlay = None
+        self._font = None
+        self._csv_file = None
+        self._csv = None
+        if csv_path:
+            self._csv_file = open(csv_path, "w", newline="")
+            self._csv = csv.writer(self._csv_file)
+            self._csv.writerow(["frame"] + [f"{phase}_ms" for phase in self.phases] + ["busy_ms", "frame_ms"])
+
+    def toggle(self):
+        self.visible = not self.visible
+        self._overlay = None
+
+    def begin_frame(self):
+        self._last = time.perf_counter()
+        self.current[:] = 0
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        self.current[self.index[phase]] += now - self._last
+        self._last = now
+
+    def end_frame(self):
+        now = time.perf_counter()
+        row = self.history[self.frames % self.window]
+        row[:-2] = self.current
+        row[-2] = self.current.sum()
+        row[-1] = now - self._last_end  # End to end, so it includes the frame limiter's wait
+        self._last_end = now
+        self.frames += 1
+        if self._csv is not None:
+            self._csv.writerow([self.frames] + [f"{seconds * 1000:.3f}" for seconds in row])
+        if self.visible and self.frames % self.refresh == 0:
+            self._overlay = None
+
+    def percentiles(self):
+        """(p50, p95, p99) in milliseconds for each phase, busy and frame column."""
+        filled = self.history[:min(self.frames, self.window)]
+        return np.percentile(filled, [50, 95, 99], axis=0).T * 1000
+
+    def draw(self, surface):
+        """Draw the overlay if it is visible and return its Rect."""
+        if not self.visible or not self.frames:
+            return None
+        if self._overlay is None:
+            self._overlay = self._render_overlay()
+        return surface.blit(self._overlay, (10, surface.get_height() - self._overlay.get_height() - 10))
+
+    def _render_overlay(self):
+        if self._font is None:
+            self._font = pygame.font.SysFont("monospace", 16)
+        lines = [f"{'phase':<10}{'p50':>7}{'p95':>7}{'p99':>7}"]
+        for name, (p50, p95, p99) in zip(self.phases + ["busy", "frame"], self.percentiles()):
+            lines.append(f"{name:<10}{p50:7.2f}{p95:7.2f}{p99:7.2f}")
+        line_height = self._font.get_linesize()
+        texts = [self._font.render(line, True, (255, 255, 255)) for line in lines]
+        overlay = pygame.Surface((max(t.get_width() for t in texts) + 12, line_height * len(texts) + 8), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 170))
+        for i, text in enumerate(texts):
+            overlay.blit(text, (6, 4 + i * line_height))
+        return overlay
+
+    def close(self):
+        if self._csv_file is not None:
+            self._csv_file.close()
+            self._csv_file = self._csv = None
+
+
+def csv_path_from_argv(argv):
+    """The path given as --profile-csv=PATH, if any."""
+    for arg in argv:
+        if arg.startswith("--profile-csv="):
+            return arg.split("=", 1)[1]
+    return None
+
+
+def profiler_from_argv(phases, argv):
+    """A game's FrameProfiler, tracing every frame to the CSV given as --profile-csv=PATH in argv.
+
+    Games toggle its overlay when TOGGLE_KEY is pressed.
+    """
+    return FrameProfiler(phases, csv_path=csv_path_from_argv(argv))
@@ -1,33 +1,44 @@
-import pygame
-import numpy as np
+import hashlib
+import inspect
+import json
 import os
-import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pygame
 
-# Initialize pygame mixer
-pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=512)
+import wavetable
+from wavetable import OscillatorBank
 
-# Create sounds directory if it doesn't exist
-if not os.path.exists("sounds"):
-    os.makedirs("sounds")
+SAMPLE_RATE = 44100
+SOUNDS_DIR = "sounds"
+CACHE_FILE = ".build_cache.json"  # Inside the output directory: file name -> hash it was built from
+BLOCK_SIZE = 65536  # Samples per block of streamed music, about 1.5 s
+NOTE_BATCH = 256  # Melody notes drawn at a time
 
 def generate_sine_wave(freq, duration, volume=0.5):
     """Generate a sine wave at the given frequency, duration, and volume"""
-    sample_rate = 44100
-    t = np.linspace(0, duration, int(duration * sample_rate), False)
-    wave = np.sin(freq * t * 2 * np.pi)
-    # Apply volume and fade out
-    wave = wave * volume
+    if pygame.mixer.get_init() is None:
+        pygame.mixer.init(frequency=SAMPLE_RATE, size=-16, channels=2, buffer=512)
+    sample_rate = SAMPLE_RATE
+    bank = OscillatorBank()
+    bank.add("sine", freq, volume)
+    wave = bank.render(int(duration * sample_rate))
+    # Apply fade out
     fade_samples = int(0.1 * sample_rate)  # 100ms fade out
     if len(wave) > fade_samples:
         fade_out = np.linspace(1.0, 0.0, fade_samples)
         wave[-fade_samples:] *= fade_out
-    # Convert to 16-bit signed integers
+    return pygame.sndarray.make_sound(to_stereo(wave))
+
+def to_stereo(wave):
+    """Convert a float wave in [-1, 1] to 16-bit stereo by duplicating the mono channel"""
     wave = np.int16(wave * 32767)
-    # Make stereo by duplicating the mono channel
-    stereo = np.column_stack((wave, wave))
-    return pygame.sndarray.make_sound(stereo)
+    return np.column_stack((wave, wave))
 
-def save_wave_to_file(wave_array, filename, sample_rate=44100):
+def save_wave_to_file(wave_array, filename, sample_rate=SAMPLE_RATE):
     """Save a numpy array as a WAV file"""
     try:
         from scipy.io import wavfile
@@ -41,202 +52,220 @@ def save_wave_to_file(wave_array, filename, sample_rate=44100):
             wave_file.setframerate(sample_rate)
             wave_file.writeframes(wave_array.tobytes())
 
-def generate_jump_sound():
-    """Generate a jump sound effect"""
-    print("Generating jump sound...")
-    # Start at a higher frequency and slide down
-    sample_rate = 44100
-    duration = 0.3
-    t = np.linspace(0, duration, int(duration * sample_rate), False)
-    
-    # Frequency slide from high to low
-    freq = np.linspace(800, 400, len(t))
-    wave = np.sin(freq * t * 2 * np.pi)
-    
-    # Apply envelope
-    envelope = np.exp(-5 * t)
-    wave = wave * envelope * 0.7
-    
-    # Convert to 16-bit signed integers
-    wave = np.int16(wave * 32767)
-    
-    # Make stereo by duplicating the mono channel
-    stereo = np.column_stack((wave, wave))
-    
-    # Save to file directly
-    save_wave_to_file(stereo, os.path.join("sounds", "jump.wav"))
-    print("Jump sound saved.")
-
-def generate_boost_sound():
-    """Generate a boost jump sound effect"""
-    print("Generating boost sound...")
-    sample_rate = 44100
-    duration = 0.4
-    t = np.linspace(0, duration, int(duration * sample_rate), False)
-    
-    # Frequency slide from low to high
-    freq = np.linspace(300, 1200, len(t))
-    wave = np.sin(freq * t * 2 * np.pi)
-    
-    # Add a second tone
-    wave2 = np.sin((freq * 1.5) * t * 2 * np.pi) * 0.5
-    wave = wave + wave2
-    
-    # Apply envelope
-    envelope = np.exp(-4 * t)
-    wave = wave * envelope * 0.8
-    
-    # Convert to 16-bit signed integers
-    wave = np.int16(wave * 32767)
-    
-    # Make stereo by duplicating the mono channel
-    stereo = np.column_stack((wave, wave))
-    
-    # Save to file directly
-    save_wave_to_file(stereo, os.path.join("sounds", "boost.wav"))
-    print("Boost sound saved.")
-
-def generate_land_sound():
-    """Generate a landing sound effect"""
-    print("Generating land sound...")
-    sample_rate = 44100
-    duration = 0.2
-    t = np.linspace(0, duration, int(duration * sample_rate), False)
-    
-    # Low frequency thud
-    freq = 150
-    wave = np.sin(freq * t * 2 * np.pi)
-    
-    # Add some noise
-    noise = np.random.uniform(-0.2, 0.2, len(t))
-    wave = wave + noise
-    
-    # Apply envelope
-    envelope = np.exp(-10 * t)
-    wave = wave * envelope * 0.6
-    
-    # Convert to 16-bit signed integers
-    wave = np.int16(wave * 32767)
-    
-    # Make stereo by duplicating the mono channel
-    stereo = np.column_stack((wave, wave))
-    
-    # Save to file directly
-    save_wave_to_file(stereo, os.path.join("sounds", "land.wav"))
-    print("Land sound saved.")
-
-def generate_game_over_sound():
-    """Generate a game over sound effect"""
-    print("Generating game over sound...")
-    sample_rate = 44100
-    duration = 1.0
-    t = np.linspace(0, duration, int(duration * sample_rate), False)
-    
-    # Descending notes
-    notes = [440, 392, 349, 330, 294]
+def save_wave_stream(blocks, filename, sample_rate=SAMPLE_RATE):
+    """Write stereo int16 blocks to a WAV file as they are produced"""
+    import wave as wave_module
+    with wave_module.open(filename, 'wb') as wave_file:
+        wave_file.setnchannels(2)
+        wave_file.setsampwidth(2)
+        wave_file.setframerate(sample_rate)
+        for block in blocks:
+            wave_file.writeframes(block.tobytes())
+
+def slide(start_freq, end_freq, frames):
+    """The glide that sounds like sin(f(t) * t) with f going from start_freq to end_freq.
+
+    That product sweeps its pitch twice as far as f itself does, so the
+    oscillator glides to start + 2 * (end - start) over the same time.
+    """
+    return start_freq + 2 * (end_freq - start_freq) * frames / (frames - 1)
+
+# Synthesizers: each takes only plain parameters and returns a stereo int16
+# array, so the same parameters always give the same file
+
+def jump_sound(duration=0.3, start_freq=800, end_freq=400, decay=5, volume=0.7, pitch=1.0):
+    """Jump: slides from high to low"""
+    frames = int(duration * SAMPLE_RATE)
+    bank = OscillatorBank()
+    bank.add("sine", start_freq * pitch)
+    bank.glide(0, slide(start_freq, end_freq, frames) * pitch)
+    t = np.arange(frames) / SAMPLE_RATE
+    return to_stereo(bank.render(frames) * np.exp(-decay * t) * volume)
+
+def boost_sound(duration=0.4, start_freq=300, end_freq=1200, harmonic=1.5, decay=4, volume=0.8, pitch=1.0):
+    """Boost jump: slides from low to high with a second tone on top"""
+    frames = int(duration * SAMPLE_RATE)
+    bank = OscillatorBank()
+    for ratio, amp in [(1, 1.0), (harmonic, 0.5)]:
+        voice = bank.add("sine", start_freq * pitch * ratio, amp)
+        bank.glide(voice, slide(start_freq, end_freq, frames) * pitch * ratio)
+    t = np.arange(frames) / SAMPLE_RATE
+    return to_stereo(bank.render(frames) * np.exp(-decay * t) * volume)
+
+def land_sound(duration=0.2, freq=150, noise=0.2, decay=10, volume=0.6, pitch=1.0, seed=0):
+    """Landing: a low thud with some noise"""
+    frames = int(duration * SAMPLE_RATE)
+    bank = OscillatorBank()
+    bank.add("sine", freq * pitch)
+    wave = bank.render(frames) + np.random.default_rng(seed).uniform(-noise, noise, frames)
+    t = np.arange(frames) / SAMPLE_RATE
+    return to_stereo(wave * np.exp(-decay * t) * volume)
+
+def game_over_sound(duration=1.0, notes=(440, 392, 349, 330, 294), decay=2, volume=0.9, pitch=1.0):
+    """Game over: descending notes"""
+    frames = int(duration * SAMPLE_RATE)
     note_duration = duration / len(notes)
-    wave = np.zeros_like(t)
-    
-    for i, note in enumerate(notes):
-        start = int(i * note_duration * sample_rate)
-        end = int((i + 1) * note_duration * sample_rate)
-        if end > len(t):
-            end = len(t)
-        t_segment = t[start:end] - (i * note_duration)
-        wave[start:end] = np.sin(note * t_segment * 2 * np.pi)
-    
-    # Apply envelope
-    envelope = np.exp(-2 * t)
-    wave = wave * envelope * 0.9
-    
-    # Convert to 16-bit signed integers
-    wave = np.int16(wave * 32767)
-    
-    # Make stereo by duplicating the mono channel
-    stereo = np.column_stack((wave, wave))
-    
-    # Save to file directly
-    save_wave_to_file(stereo, os.path.join("sounds", "gameover.wav"))
-    print("Game over sound saved.")
-
-def generate_background_music():
-    """Generate simple background music"""
-    print("Generating background music...")
-    sample_rate = 44100
-    duration = 10.0  # 10 seconds of music that will loop
-    t = np.linspace(0, duration, int(duration * sample_rate), False)
-    
-    # Base frequencies for a simple melody
-    melody_notes = [262, 294, 330, 349, 392, 440, 494, 523]  # C4 to C5
-    chord_notes = [262, 330, 392]  # C major chord
-    
-    # Create a simple melody
-    melody = np.zeros_like(t)
-    chord = np.zeros_like(t)
-    
-    # Divide into measures
-    measures = 8
-    measure_duration = duration / measures
-    notes_per_measure = 4
-    note_duration = measure_duration / notes_per_measure
-    
-    for measure in range(measures):
-        for note in range(notes_per_measure):
-            start = int((measure * measure_duration + note * note_duration) * sample_rate)
-            end = int((measure * measure_duration + (note + 0.9) * note_duration) * sample_rate)
-            if end > len(t):
-                end = len(t)
-                
-            # Choose a random note from the melody
-            melody_freq = melody_notes[random.randint(0, len(melody_notes)-1)]
-            t_segment = t[start:end] - (measure * measure_duration + note * note_duration)
-            melody[start:end] = np.sin(melody_freq * t_segment * 2 * np.pi) * 0.3
-            
-            # Add a chord every first beat
-            if note == 0:
-                for chord_note in chord_notes:
-                    chord[start:end] += np.sin(chord_note * t_segment * 2 * np.pi) * 0.1
-    
-    # Combine melody and chord
-    wave = melody + chord
-    
-    # Apply a gentle envelope to each note to avoid clicks
-    for measure in range(measures):
-        for note in range(notes_per_measure):
-            start = int((measure * measure_duration + note * note_duration) * sample_rate)
-            end = int((measure * measure_duration + (note + 1) * note_duration) * sample_rate)
-            if end > len(t):
-                end = len(t)
-                
-            # Apply attack and release
-            attack_samples = int(0.01 * sample_rate)  # 10ms attack
-            release_samples = int(0.05 * sample_rate)  # 50ms release
-            
-            if end - start > attack_samples + release_samples:
-                # Attack
-                attack = np.linspace(0.0, 1.0, attack_samples)
-                wave[start:start+attack_samples] *= attack
-                
-                # Release
-                release = np.linspace(1.0, 0.0, release_samples)
-                wave[end-release_samples:end] *= release
-    
-    # Convert to 16-bit signed integers
-    wave = np.int16(wave * 32767)
-    
-    # Make stereo by duplicating the mono channel
-    stereo = np.column_stack((wave, wave))
-    
-    # Save to file directly
-    save_wave_to_file(stereo, os.path.join("sounds", "background.wav"))
-    print("Background music saved.")
+    bank = OscillatorBank()
+    bank.add("sine", notes[0] * pitch)
+    starts = np.minimum(note_starts(np.arange(len(notes)), note_duration), frames)
+    freqs = np.asarray(notes, dtype=np.float64)[:, None] * pitch
+    # Each note's phase starts from zero at the note's exact start time
+    phases = freqs * (starts / SAMPLE_RATE - np.arange(len(notes)) * note_duration)[:, None]
+    wave = bank.render_notes(starts, freqs, phases, frames)
+    t = np.arange(frames) / SAMPLE_RATE
+    return to_stereo(wave * np.exp(-decay * t) * volume)
+
+def note_starts(notes, note_duration, sample_rate=SAMPLE_RATE):
+    """First sample of each given note"""
+    return (notes * note_duration * sample_rate).astype(np.int64)
+
+def background_music_blocks(duration=10.0, measures=8, notes_per_measure=4, seed=0,
+                            melody_notes=(262, 294, 330, 349, 392, 440, 494, 523),  # C4 to C5
+                            chord_notes=(262, 330, 392),  # C major chord
+                            block_size=BLOCK_SIZE):
+    """Background music: a random melody over a chord on every first beat, in blocks of block_size samples.
+
+    Only one block and one batch of note choices are held at a time, so an
+    hour-long track takes no more memory than a ten second one, and the
+    melody keeps drawing new notes for as long as the track runs.
+    """
+    total = int(duration * SAMPLE_RATE)
+    count = measures * notes_per_measure
+    note_duration = duration / count
+    note_samples = note_duration * SAMPLE_RATE
+    attack_samples = int(0.01 * SAMPLE_RATE)  # 10ms attack
+    release_samples = int(0.05 * SAMPLE_RATE)  # 50ms release
+    rng = np.random.default_rng(seed)
+    drawn_from, drawn = 0, np.empty(0, dtype=np.int64)  # Melody note choices for notes drawn_from...
+    # The melody voice, then one voice per chord note
+    voices = OscillatorBank()
+    voices.add("sine", melody_notes[0], 0.3)
+    for note in chord_notes:
+        voices.add("sine", note, 0.1)
+
+    for block_start in range(0, total, block_size):
+        block_end = min(block_start + block_size, total)
+        samples = np.arange(block_start, block_end)
+        # The notes this block overlaps; the estimate can be one off either way where a start was rounded
+        notes = np.arange(max(int(block_start / note_samples) - 1, 0), min(int(block_end / note_samples) + 2, count))
+        starts = note_starts(notes, note_duration)
+        ends = np.append(starts[1:], note_starts(notes[-1] + 1, note_duration) if notes[-1] < count - 1 else total)
+        overlap = (ends > block_start) & (starts < block_end)
+        notes, starts, ends = notes[overlap], starts[overlap], ends[overlap]
+        # Per-sample note values, each repeated across that note's samples in the block
+        lengths = np.minimum(ends, block_end) - np.maximum(starts, block_start)
+        offset = samples - np.repeat(starts, lengths)  # Samples since the note started
+        length = np.repeat(ends - starts, lengths)
+
+        # Draw melody notes in batches as the track reaches them
+        while notes[-1] >= drawn_from + len(drawn):
+            kept = drawn[notes[0] - drawn_from:]
+            batch = rng.integers(0, len(melody_notes), min(NOTE_BATCH, count - drawn_from - len(drawn)))
+            drawn_from, drawn = notes[0], np.concatenate((kept, batch))
+
+        # Every note of the block in one pass; each voice's phase starts from zero at the note's start time
+        firsts = np.maximum(starts - block_start, 0)  # Where each note starts within the block
+        freqs = np.empty((len(notes), len(voices)))
+        freqs[:, 0] = np.asarray(melody_notes, dtype=np.float64)[drawn[notes - drawn_from]]
+        freqs[:, 1:] = chord_notes
+        amps = np.tile(voices.amps, (len(notes), 1))
+        amps[notes % notes_per_measure != 0, 1:] = 0  # The chord only sounds on first beats
+        t_note = (block_start + firsts) / SAMPLE_RATE - notes * note_duration
+        wave = voices.render_notes(firsts, freqs, freqs * t_note[:, None], len(samples), amps)
+        # Each note sounds for 90% of its beat
+        wave[samples >= np.repeat(note_starts(notes + 0.9, note_duration), lengths)] = 0
+
+        # Attack and release on every note to avoid clicks
+        attack = offset < attack_samples
+        wave[attack] *= offset[attack] / (attack_samples - 1)
+        to_end = length - offset  # 1 on a note's last sample
+        release = to_end <= release_samples
+        wave[release] *= (to_end[release] - 1) / (release_samples - 1)
+        yield to_stereo(wave)
+
+SYNTHS = {f.__name__: f for f in [jump_sound, boost_sound, land_sound, game_over_sound, background_music_blocks]}
+
+# The files the games load: file name -> (synthesizer, parameters)
+SOUND_BANK = {
+    "jump.wav": ("jump_sound", {}),
+    "boost.wav": ("boost_sound", {}),
+    "land.wav": ("land_sound", {}),
+    "gameover.wav": ("game_over_sound", {}),
+    "background.wav": ("background_music_blocks", {}),
+}
+
+def sound_bank(variants=1, music_seconds=None):
+    """The standard bank plus variants-1 extra takes on every effect, pitched and seeded differently.
+
+    music_seconds makes the background track that long, at the same tempo.
+    """
+    bank = dict(SOUND_BANK)
+    if music_seconds is not None:
+        bank["background.wav"] = ("background_music_blocks", {"duration": music_seconds,
+                                                              "measures": max(1, round(music_seconds / 1.25))})
+    for v in range(1, variants):
+        for name, (synth, params) in SOUND_BANK.items():
+            if synth == "background_music_blocks":
+                continue
+            params = dict(params, pitch=2 ** (((v * 5) % 13 - 6) / 12))  # Within half an octave
+            if "seed" in inspect.signature(SYNTHS[synth]).parameters:
+                params["seed"] = v
+            bank[f"{name[:-4]}_{v + 1}.wav"] = (synth, params)
+    return bank
+
+def build_hash(synth, params):
+    """Changes whenever the parameters, the synthesizer's code or the file writers change"""
+    source = "".join(inspect.getsource(f) for f in [SYNTHS[synth], to_stereo, slide, note_starts, wavetable,
+                                                    save_wave_to_file, save_wave_stream])
+    key = json.dumps([synth, params, source, SAMPLE_RATE, BLOCK_SIZE, NOTE_BATCH], sort_keys=True)
+    return hashlib.sha1(key.encode()).hexdigest()
+
+def build_sound(job):
+    """Synthesize and save one file; runs in a worker process"""
+    path, synth, params = job
+    start = time.perf_counter()
+    sound = SYNTHS[synth](**params)
+    if isinstance(sound, np.ndarray):
+        save_wave_to_file(sound, path)
+    else:
+        save_wave_stream(sound, path)
+    return path, time.perf_counter() - start
+
+def build(out_dir=SOUNDS_DIR, variants=1, workers=None, force=False, music_seconds=None):
+    """Build every file in the bank whose hash changed, in parallel; returns (built, cached) counts"""
+    os.makedirs(out_dir, exist_ok=True)
+    cache_path = os.path.join(out_dir, CACHE_FILE)
+    try:
+        with open(cache_path) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+
+    jobs, hashes = [], {}
+    for name, (synth, params) in sound_bank(variants, music_seconds).items():
+        hashes[name] = build_hash(synth, params)
+        path = os.path.join(out_dir, name)
+        if force or cache.get(name) != hashes[name] or not os.path.exists(path):
+            jobs.append((path, synth, params))
+
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for path, seconds in pool.map(build_sound, jobs, chunksize=max(1, len(jobs) // 32)):
+                name = os.path.basename(path)
+                cache[name] = hashes[name]
+                print(f"  built  {name:<20}{seconds * 1000:8.1f} ms")
+        with open(cache_path, "w") as f:
+            json.dump(cache, f, indent=1, sort_keys=True)
+    return len(jobs), len(hashes) - len(jobs)
 
 if __name__ == "__main__":
+    # python generate_sounds.py [--variants=N] [--music-seconds=S] [--workers=N] [--out=DIR] [--force]
+    options = dict(arg[2:].split("=", 1) if "=" in arg else (arg[2:], True) for arg in sys.argv[1:])
     print("Generating sound effects...")
-    generate_jump_sound()
-    generate_boost_sound()
-    generate_land_sound()
-    generate_game_over_sound()
-    generate_background_music()
-    print("All sound effects generated successfully!")
+    start = time.perf_counter()
+    built, cached = build(out_dir=options.get("out", SOUNDS_DIR), variants=int(options.get("variants", 1)),
+                          workers=int(options["workers"]) if "workers" in options else None,
+                          force="force" in options,
+                          music_seconds=float(options["music-seconds"]) if "music-seconds" in options else None)
+    print(f"{built} built, {cached} unchanged, in {time.perf_counter() - start:.2f}s")
     print("You can now run the game with sound.")
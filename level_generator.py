@@ -0,0 +1,176 @@
+import random
+import sys
+import threading
+import time
+from collections import deque, namedtuple
+
+# Platform kind when no variations are given; variations name any others
+NORMAL = "normal"
+
+PlatformSpec = namedtuple("PlatformSpec", "x kind")
+
+
+def generate_chunk(seed, index, size, previous_x, x_range, variations=None, validate=None, retries=20):
+    """The platforms of chunk `index`, bottom to top.
+
+    Each chunk has its own Random seeded from (seed, index), so a chunk comes
+    out the same whichever thread builds it. previous_x is the last platform
+    of the chunk below; validate(previous_x, x), if given, rejects candidates
+    the player could not reach.
+    """
+    rng = random.Random(f"{seed}:{index}")
+    platforms = []
+    for _ in range(size):
+        for _ in range(retries):
+            x = rng.randint(*x_range)
+            if validate is None or previous_x is None or validate(previous_x, x):
+                break
+        kind = NORMAL
+        if variations:
+            roll = rng.random()
+            for name, chance in variations.items():
+                if roll < chance:
+                    kind = name
+                    break
+                roll -= chance
+        platforms.append(PlatformSpec(x, kind))
+        previous_x = x
+    return platforms
+
+
+class LevelGenerator:
+    """Seeded platforms built in chunks ahead of the camera on a worker thread.
+
+    The worker keeps up to `lookahead` finished chunks in a deque; the game
+    takes platforms one at a time with next_platform(), which never waits.
+    Appending and popping a deque are atomic, so the handoff needs no lock.
+    If the worker has fallen behind, the game builds the chunk itself (and
+    counts it in `inline_chunks`); chunks are pure functions of the seed, so
+    the level is identical either way. When it has nothing else to do, the
+    worker also builds the first chunk of the next level, so reset() with no
+    seed (or with next_seed()) can lay out a whole screen of platforms
+    without generating any.
+    """
+
+    def __init__(self, x_range, seed=None, chunk_size=16, lookahead=4, variations=None, validate=None, threaded=True):
+        self.x_range = x_range
+        self.chunk_size = chunk_size
+        self.lookahead = lookahead
+        self.variations = variations
+        self.validate = validate
+        self.inline_chunks = 0
+        self._ready = deque()  # (epoch, index, chunk) from the worker
+        self._wanted = threading.Event()
+        self._stop = False
+        self._epoch = -1  # Bumped by every reset so the worker can tell levels apart
+        self._next_seed = random.getrandbits(32)  # Seed the next reset() without a seed will use
+        self._prebuilt = None  # (seed, first chunk) for that level
+        self.reset(seed)
+        self._thread = None
+        if threaded:
+            self._thread = threading.Thread(target=self._run, name="level-generator", daemon=True)
+            self._thread.start()
+
+    def reset(self, seed=None):
+        """Start a new level; chunks already built for the old one are discarded."""
+        # The worker reads _epoch first, so it is written last
+        if seed is None:
+            seed = self._next_seed
+        if seed == self._next_seed:
+            self._next_seed = random.getrandbits(32)
+        self.seed = seed
+        self._chunk = []
+        self._position = 0
+        # (next chunk the game will take, x of the last platform before it), published as one
+        # tuple so the worker can never pair one chunk's index with another chunk's last x
+        self._progress = (0, None)
+        self._ready.clear()
+        self._epoch += 1
+        self._wanted.set()
+
+    def next_seed(self):
+        """The seed reset() with no seed will use; its first chunk is built ahead of time."""
+        return self._next_seed
+
+    def next_platform(self):
+        if self._position == len(self._chunk):
+            self._chunk = self._take_chunk()
+            self._position = 0
+            self._progress = (self._progress[0] + 1, self._chunk[-1].x)
+        platform = self._chunk[self._position]
+        self._position += 1
+        return platform
+
+    def position(self):
+        """(seed, chunks taken, platforms taken from the last one); equal positions continue identically."""
+        return self.seed, self._progress[0], self._position
+
+    def close(self):
+        self._stop = True
+        self._wanted.set()
+
+    def _build(self, seed, index, previous_x):
+        return generate_chunk(seed, index, self.chunk_size, previous_x, self.x_range,
+                              self.variations, self.validate)
+
+    def _take_chunk(self):
+        wanted, last_x = self._progress
+        prebuilt = self._prebuilt
+        if wanted == 0 and prebuilt is not None and prebuilt[0] == self.seed:
+            return prebuilt[1]
+        ready = self._ready
+        while ready:
+            epoch, index, chunk = ready.popleft()
+            self._wanted.set()
+            if epoch == self._epoch and index == wanted:
+                return chunk
+            # Stale: from before a reset, or a chunk the game already built itself
+        self.inline_chunks += 1
+        return self._build(self.seed, wanted, last_x)
+
+    def _run(self):
+        epoch, seed, index, last_x = None, None, 0, None
+        while not self._stop:
+            self._wanted.clear()
+            if epoch != self._epoch or index < self._progress[0]:
+                # New level, or the game got ahead of us: continue from where it is
+                epoch = self._epoch
+                seed = self.seed
+                index, last_x = self._progress
+            if len(self._ready) >= self.lookahead:
+                next_seed = self._next_seed
+                if self._prebuilt is None or self._prebuilt[0] != next_seed:
+                    self._prebuilt = (next_seed, self._build(next_seed, 0, None))
+                    continue
+                self._wanted.wait()
+                continue
+            chunk = self._build(seed, index, last_x)
+            if epoch == self._epoch:
+                self._ready.append((epoch, index, chunk))
+            index += 1
+            last_x = chunk[-1].x
+
+
+if __name__ == "__main__":
+    # Take platforms at the game's fastest respawn rate while chunks are slow to
+    # build (simulated validation cost) and report how often the game had to wait
+    delay = float(sys.argv[1]) if len(sys.argv) > 1 else 0.0005
+
+    def slow_validate(previous_x, x):
+        time.sleep(delay)
+        return abs(x - previous_x) < 400
+
+    level = LevelGenerator((50, 630), seed=1, validate=slow_validate)
+    reference = LevelGenerator((50, 630), seed=1, validate=slow_validate, threaded=False)
+    worst = 0.0
+    time.sleep(0.5)  # Let the worker get ahead, as it does while the game starts up
+    for frame in range(600):
+        start = time.perf_counter()
+        if frame == 300:
+            level.reset()  # A restart mid-run
+            reference.reset(level.seed)
+        platform = level.next_platform()
+        worst = max(worst, time.perf_counter() - start)
+        assert platform == reference.next_platform()
+        time.sleep(1 / 60 / 4)  # Four respawns per frame at most, far above real play
+    print(f"600 platforms: worst take {worst * 1000:.3f} ms, {level.inline_chunks} chunks built on the game thread")
@@ -0,0 +1,161 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pygame
+
+from ecs import Archetype
+
+# Boost particle colors, spread over the same range the Particle class picked from
+PALETTE = [(red, green, 0) for red in (207, 221, 235, 249) for green in (112, 137, 162, 187)]
+MAX_RADIUS = 6
+BLIT_CAP = 4000  # Newest particles drawn as sprites each frame; older ones beyond it become 2x2 points
+FRAME_BUDGET = 1 / 60
+
+
+class ParticlePool:
+    """Fixed-capacity particle system stored as a pooled Archetype, one array per component.
+
+    Live particles are always the archetype's first rows. update() moves them
+    all at once and removes the dead, which compacts the survivors to the
+    front in order, so bursts never allocate Python objects and removing
+    dead particles is not O(n^2).
+
+    draw() blits a circle sprite per particle until there are more than
+    blit_cap of them; past that the oldest, which are faded and buried under
+    newer bursts, are written straight into the surface's pixels as 2x2
+    points, so drawing stays well inside a frame at tens of thousands.
+    """
+
+    def __init__(self, capacity=50000, gravity=0.05, seed=None, blit_cap=BLIT_CAP):
+        self.capacity = capacity
+        self.blit_cap = blit_cap
+        self.gravity = gravity
+        self.rng = np.random.default_rng(seed)
+        self.particles = Archetype("particles", {
+            "x": np.float32, "y": np.float32, "vx": np.float32, "vy": np.float32, "radius": np.float32,
+            "color": np.int32,  # Index into PALETTE
+            "lifetime": np.int32,
+        }, capacity, fixed=True)
+        self._sprites = None  # Built on first draw, once a display exists
+
+    def __len__(self):
+        return len(self.particles)
+
+    def clear(self):
+        self.particles.clear()
+
+    def emit(self, x, y, amount=20):
+        """Start a burst at (x, y); particles beyond capacity are dropped."""
+        n = min(amount, self.capacity - len(self.particles))
+        rng = self.rng
+        self.particles.spawn_many(n, x=x, y=y, vx=rng.uniform(-1, 1, n), vy=rng.uniform(-2, 0, n),
+                                  radius=rng.integers(2, 7, n), color=rng.integers(0, len(PALETTE), n),
+                                  lifetime=rng.integers(20, 41, n))
+
+    def update(self):
+        particles = self.particles
+        if not len(particles):
+            return
+        particles["x"] += particles["vx"]
+        particles["y"] += particles["vy"]
+        particles["vy"] += self.gravity
+        lifetime = particles["lifetime"]
+        lifetime -= 1
+        # Fade out effect
+        radius = particles["radius"]
+        radius[lifetime < 10] *= 0.9
+        particles.remove(lifetime <= 0)
+
+    def _build_sprites(self):
+        # One colorkeyed circle per (radius, color); index is radius * len(PALETTE) + color
+        sprites = []
+        for radius in range(MAX_RADIUS + 1):
+            for color in PALETTE:
+                sprite = pygame.Surface((2 * radius + 1, 2 * radius + 1))
+                sprite.set_colorkey((0, 0, 0))
+                if radius:
+                    pygame.draw.circle(sprite, color, (radius, radius), radius)
+                if pygame.display.get_surface() is not None:
+                    sprite = sprite.convert()
+                sprites.append(sprite)
+        return sprites
+
+    def draw(self, surface):
+        """Draw every visible particle and return their bounding Rect (None if nothing was drawn)."""
+        if self._sprites is None:
+            self._sprites = self._build_sprites()
+        particles = self.particles
+        radius = particles["radius"].astype(np.int32)  # Same truncation as int(self.radius)
+        visible = np.flatnonzero(radius > 0)
+        if not len(visible):
+            return None
+        radius = radius[visible]
+        color = particles["color"][visible]
+        keys = radius * len(PALETTE) + color
+        left = particles["x"][visible].astype(np.int32) - radius
+        top = particles["y"][visible].astype(np.int32) - radius
+        # Survivors keep their order, so the first ones are the oldest and are drawn first, underneath
+        split = 0
+        if len(visible) > self.blit_cap and surface.get_bytesize() != 3:  # No integer type for 24-bit pixels
+            split = len(visible) - self.blit_cap
+            self._splat(surface, left[:split] + radius[:split], top[:split] + radius[:split], color[:split])
+        sprites = map(self._sprites.__getitem__, keys[split:].tolist())
+        surface.blits(zip(sprites, zip(left[split:].tolist(), top[split:].tolist())), doreturn=False)
+        size = 2 * radius + 1
+        bounds = pygame.Rect(int(left.min()), int(top.min()), 0, 0)
+        bounds.width = int((left + size).max()) - bounds.x
+        bounds.height = int((top + size).max()) - bounds.y
+        return bounds.clip(surface.get_rect())
+
+    @staticmethod
+    def _splat(surface, x, y, color):
+        # A 2x2 point up and left of each centre, written through the surface's raw pixel buffer
+        bytesize = surface.get_bytesize()
+        width, height = surface.get_size()
+        pitch = surface.get_pitch() // bytesize
+        inside = (x >= 1) & (x < width) & (y >= 1) & (y < height)
+        mapped = np.array([surface.map_rgb(rgb) for rgb in PALETTE], dtype=np.int64)
+        values = mapped[color[inside]]
+        index = y[inside] * pitch + x[inside]
+        # The buffer locks the surface until both it and the array over it are gone
+        pixels = np.frombuffer(surface.get_buffer(), dtype={1: np.uint8, 2: np.uint16, 4: np.uint32}[bytesize])
+        values = values.astype(pixels.dtype)
+        for offset in (0, -1, -pitch, -pitch - 1):
+            pixels[index + offset] = values
+        del pixels
+
+
+if __name__ == "__main__":
+    # python particle_pool.py [live] [frames] [--check]: keep a pool topped up at the requested size and
+    # time update and draw per frame; --check fails unless the two together fit a 60 FPS frame
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    live = int(args[0]) if len(args) > 0 else 50000
+    frames = int(args[1]) if len(args) > 1 else 120
+    pygame.init()
+    screen = pygame.display.set_mode((800, 600))
+    pool = ParticlePool(capacity=live)
+    rng = np.random.default_rng(0)
+    pool.draw(screen)  # Builds the sprites, outside the timed frames
+    update_time = draw_time = worst = 0.0
+    for _ in range(frames):
+        while len(pool) < live:
+            pool.emit(rng.uniform(0, 800), rng.uniform(0, 600), 20)
+        start = time.perf_counter()
+        pool.update()
+        middle = time.perf_counter()
+        screen.fill((0, 0, 0))
+        pool.draw(screen)
+        end = time.perf_counter()
+        update_time += middle - start
+        draw_time += end - middle
+        worst = max(worst, end - start)
+    total = (update_time + draw_time) / frames
+    print(f"{live} particles: update {update_time / frames * 1000:.2f} ms, draw {draw_time / frames * 1000:.2f} ms per frame, "
+          f"worst update+draw {worst * 1000:.2f} ms")
+    print(f"update+draw {total * 1000:.2f} ms against a {FRAME_BUDGET * 1000:.1f} ms frame: "
+          f"{'within budget' if total < FRAME_BUDGET else 'OVER BUDGET'}")
+    if "--check" in sys.argv:
+        assert total < FRAME_BUDGET, "particle update+draw does not fit a 60 FPS frame"
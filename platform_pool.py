@@ -0,0 +1,109 @@
+import pygame
+
+
+class PlatformPool:
+    """A fixed ring of platform slots, ordered from the lowest platform to the highest.
+
+    New platforms always appear above the highest one and old ones always
+    leave through the bottom, so the ring stays sorted by height without ever
+    being reordered. Respawning moves the bottom slot's Rect to the top in
+    place; nothing is allocated while scrolling. Visited state is one bit per
+    slot, cleared when the slot is reused.
+
+    Each slot also counts its respawns. Code that holds on to a platform keeps
+    a handle, a (slot, generation) pair, rather than the bare slot: once the
+    slot is recycled for a new platform the handle goes stale, so resolve()
+    returns None and visit() refuses it instead of acting on the newcomer.
+    """
+
+    def __init__(self, capacity, width, height):
+        self.capacity = capacity
+        self.rects = [pygame.Rect(0, 0, width, height) for _ in range(capacity)]
+        self.generations = [0] * capacity  # Respawns of each slot; part of every handle to it
+        self.visited = 0  # Bit i set when slot i's current platform has been landed on
+        self.head = 0  # Slot of the lowest platform
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        """Platform Rects, highest first."""
+        rects = self.rects
+        for i in range(self.count - 1, -1, -1):
+            yield rects[self.slot_at(i)]
+
+    def clear(self):
+        self.head = self.count = 0
+        self.visited = 0
+
+    def spawn(self, x, y):
+        """Place a platform above all others in the next free slot and return its handle."""
+        if self.count == self.capacity:
+            raise IndexError("platform pool is full")
+        slot = (self.head + self.count) % self.capacity
+        rect = self.rects[slot]
+        rect.x, rect.y = x, y
+        self.generations[slot] += 1
+        self.visited &= ~(1 << slot)
+        self.count += 1
+        return slot, self.generations[slot]
+
+    def highest(self):
+        return self.rects[(self.head + self.count - 1) % self.capacity]
+
+    def slot_at(self, i):
+        """Slot of the i-th platform counting up from the lowest."""
+        return (self.head + i) % self.capacity
+
+    def between(self, top_min, top_max):
+        """Handles of the platforms whose top lies in [top_min, top_max], highest first."""
+        rects, count = self.rects, self.count
+        # Tops decrease going up the ring: find the first platform with top <= top_max
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if rects[self.slot_at(mid)].top > top_max:
+                lo = mid + 1
+            else:
+                hi = mid
+        end = lo
+        while end < count and rects[self.slot_at(end)].top >= top_min:
+            end += 1
+        for i in range(end - 1, lo - 1, -1):
+            slot = self.slot_at(i)
+            yield slot, self.generations[slot]
+
+    def handle(self, slot):
+        """A (slot, generation) pair that stops resolving once the slot is respawned."""
+        return slot, self.generations[slot]
+
+    def resolve(self, handle):
+        """The platform's Rect, or None if its slot has since been given to another platform."""
+        slot, generation = handle
+        return self.rects[slot] if self.generations[slot] == generation else None
+
+    def visit(self, handle):
+        """Mark a platform as landed on; True the first time, False again or once the handle is stale."""
+        slot, generation = handle
+        if self.generations[slot] != generation:
+            return False
+        bit = 1 << slot
+        if self.visited & bit:
+            return False
+        self.visited |= bit
+        return True
+
+    def scroll(self, dy, remove_below):
+        """Move every platform down by dy and free the slots of those below remove_below.
+
+        Returns how many were freed; spawn() the same number to refill the ring.
+        """
+        for rect in self.rects:
+            rect.y += dy
+        freed = 0
+        while self.count and self.rects[self.head].top > remove_below:
+            self.head = (self.head + 1) % self.capacity
+            self.count -= 1
+            freed += 1
+        return freed
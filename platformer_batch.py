@@ -0,0 +1,153 @@
+import random
+import sys
+import time
+
+import numpy as np
+
+from level_generator import LevelGenerator
+from platformer_sim import (PlatformerSim, follow_inputs, WIDTH, HEIGHT, PLAYER_SIZE, PLATFORM_WIDTH,
+                            GRAVITY, JUMP_POWER, PLAYER_SPEED, PLATFORM_GAP, SCROLL_SPEED, MAX_BOOST_JUMPS,
+                            LANDING_WINDOW, EDGE_MARGIN, PLATFORM_COUNT, PLATFORM_X_RANGE, INPUT_LEFT, INPUT_RIGHT, INPUT_BOOST)
+
+
+class BatchSim:
+    """Many independent platformer runs advanced together with NumPy.
+
+    Every array has one row per run. Platforms live in fixed slots (the scalar
+    game's list order is irrelevant because only one platform can match a
+    landing or leave the screen in any step). Each run keeps its own
+    unthreaded LevelGenerator so seeded layouts match PlatformerSim exactly.
+    """
+
+    def __init__(self, seeds):
+        self.seeds = list(seeds)
+        n = self.n = len(self.seeds)
+        self.player_radius = PLAYER_SIZE // 2
+        self.player_x = np.full(n, WIDTH // 2, dtype=np.float64)
+        self.player_y = np.full(n, HEIGHT - 100, dtype=np.float64)
+        self.player_velocity_y = np.zeros(n, dtype=np.float64)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.boost_jumps = np.full(n, MAX_BOOST_JUMPS, dtype=np.int64)
+        self.on_ground = np.zeros(n, dtype=bool)
+        self.game_over = np.zeros(n, dtype=bool)
+        self.steps = np.zeros(n, dtype=np.int64)
+
+        # Same platforms in the same order as PlatformerSim.create_platforms()
+        self.levels = [LevelGenerator(PLATFORM_X_RANGE, seed, threaded=False) for seed in self.seeds]
+        self.platform_x = np.empty((n, PLATFORM_COUNT), dtype=np.int64)
+        self.platform_y = np.empty((n, PLATFORM_COUNT), dtype=np.int64)
+        self.platform_x[:, 0] = WIDTH // 2 - PLATFORM_WIDTH // 2
+        self.platform_y[:, 0] = HEIGHT - 50
+        for row, level in enumerate(self.levels):
+            for i in range(1, PLATFORM_COUNT):
+                self.platform_x[row, i] = level.next_platform().x
+        self.platform_y[:, 1:] = HEIGHT - 150 - np.arange(PLATFORM_COUNT - 1) * PLATFORM_GAP
+        self.visited = np.zeros((n, PLATFORM_COUNT), dtype=bool)
+
+    def step(self, inputs=0):
+        """Advance every run by one step; inputs is a bitmask or one bitmask per run."""
+        inputs = np.broadcast_to(np.asarray(inputs, dtype=np.int64), (self.n,))
+        radius = self.player_radius
+        x, y, vy = self.player_x, self.player_y, self.player_velocity_y
+        alive = ~self.game_over
+        self.steps += alive
+
+        # Boost jump with limited uses
+        boost = alive & (inputs & INPUT_BOOST != 0) & (self.boost_jumps > 0) & ~self.on_ground
+        vy[boost] = -JUMP_POWER
+        self.boost_jumps -= boost
+
+        # Player movement and wrap around screen edges
+        x -= np.where(alive & (inputs & INPUT_LEFT != 0), PLAYER_SPEED, 0)
+        x += np.where(alive & (inputs & INPUT_RIGHT != 0), PLAYER_SPEED, 0)
+        off_right = alive & (x - radius > WIDTH)
+        off_left = alive & ~off_right & (x + radius < 0)
+        x[off_right] = -radius
+        x[off_left] = WIDTH + radius
+
+        # Apply gravity
+        vy[alive] += GRAVITY
+        y[alive] += vy[alive]
+        self.on_ground &= ~alive
+
+        # Platform landing (only when falling), same swept window as the scalar game
+        feet = (y + radius)[:, None]
+        top = self.platform_y
+        left = self.platform_x
+        hits = ((alive & (vy > 0))[:, None] &
+                (feet >= top) & (feet - np.maximum(LANDING_WINDOW, vy)[:, None] <= top) &
+                ((x + radius)[:, None] > left + EDGE_MARGIN) &
+                ((x - radius)[:, None] < left + PLATFORM_WIDTH - EDGE_MARGIN))
+        landed = hits.any(axis=1)
+        rows = np.nonzero(landed)[0]
+        slots = hits[rows].argmax(axis=1)
+        y[rows] = top[rows, slots] - radius
+        vy[rows] = -JUMP_POWER
+        self.on_ground[rows] = True
+
+        # Only score platforms not visited before
+        fresh = ~self.visited[rows, slots]
+        rows, slots = rows[fresh], slots[fresh]
+        self.visited[rows, slots] = True
+        self.score[rows] += 1
+        bonus = rows[self.score[rows] % 5 == 0]
+        self.boost_jumps[bonus] = np.minimum(self.boost_jumps[bonus] + 1, MAX_BOOST_JUMPS)
+
+        # Check if player fell off the bottom
+        self.game_over |= alive & (y - radius > HEIGHT)
+
+        # Scroll the world when player reaches upper half
+        scroll = alive & (y < HEIGHT // 2)
+        y[scroll] += SCROLL_SPEED
+        self.platform_y[scroll] += SCROLL_SPEED
+        gone = scroll[:, None] & (self.platform_y > HEIGHT)
+        rows, slots = np.nonzero(gone)
+        if len(rows):
+            # The scalar game places the new platform a gap above the highest
+            # platform as it stood before this step's scroll, and leaves it unscrolled
+            highest = np.where(gone[rows], np.iinfo(np.int64).max, self.platform_y[rows]).min(axis=1)
+            self.platform_y[rows, slots] = highest - SCROLL_SPEED - PLATFORM_GAP
+            self.platform_x[rows, slots] = [self.levels[row].next_platform().x for row in rows]
+            self.visited[rows, slots] = False
+
+
+def check_parity(runs=64, steps=3000, seed=0):
+    """Step PlatformerSim and BatchSim side by side and fail on the first difference."""
+    seeds = [seed + i for i in range(runs)]
+    sims = [PlatformerSim(s) for s in seeds]
+    batch = BatchSim(seeds)
+    input_rngs = [random.Random(s) for s in seeds]
+    for step in range(steps):
+        inputs = [follow_inputs(sim, rng) for sim, rng in zip(sims, input_rngs)]
+        for sim, bits in zip(sims, inputs):
+            sim.step(bits)
+        batch.step(inputs)
+        for row, sim in enumerate(sims):
+            platforms = sim.platforms
+            # Each platform's top, left edge and whether it has been landed on; slots differ between the two
+            expected = (sim.player_pos[0], sim.player_pos[1], sim.player_velocity_y,
+                        sim.score, sim.boost_jumps, sim.game_over, sim.on_ground,
+                        sorted((platforms.rects[slot].y, platforms.rects[slot].x, bool(platforms.visited >> slot & 1))
+                               for slot in map(platforms.slot_at, range(len(platforms)))))
+            actual = (batch.player_x[row], batch.player_y[row], batch.player_velocity_y[row],
+                      batch.score[row], batch.boost_jumps[row], batch.game_over[row], batch.on_ground[row],
+                      sorted(zip(batch.platform_y[row].tolist(), batch.platform_x[row].tolist(),
+                                 batch.visited[row].tolist())))
+            assert expected == actual, f"run {row} differs at step {step}:\n{expected}\n{actual}"
+    print(f"Parity OK: {runs} runs x {steps} steps, best score {max(s.score for s in sims)}")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--check"]:
+        check_parity()
+    else:
+        runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+        steps = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+        batch = BatchSim(range(runs))
+        rng = np.random.default_rng(0)
+        start = time.perf_counter()
+        for _ in range(steps):
+            batch.step(rng.choice([0, INPUT_LEFT, INPUT_RIGHT], size=runs))
+        elapsed = time.perf_counter() - start
+        print(f"{runs} runs x {steps} steps in {elapsed:.2f}s ({runs * steps / elapsed:.0f} run-steps/s), "
+              f"mean score {batch.score.mean():.2f}, {batch.game_over.sum()} finished")
@@ -4,7 +4,17 @@ import sys
 import os
 import math
 
+from frame_profiler import PLATFORMER_PHASES, TOGGLE_KEY, profiler_from_argv
+from level_generator import LevelGenerator
+from particle_pool import ParticlePool
+from platform_pool import PlatformPool
+from sound_dispatcher import PLATFORMER_GROUPS, PLATFORMER_SOUNDS, SoundDispatcher, init_mixer
+from sprite_batch import SpriteBatch, paint_boost_orb
+from text_cache import TextCache
+from ui import Label, Panel
+
 # Initialize pygame
+init_mixer()  # Small mixer buffer so effects start within a few milliseconds
 pygame.init()
 pygame.mixer.init()
 
@@ -14,6 +24,7 @@ PLAYER_SIZE = 40
 PLATFORM_WIDTH, PLATFORM_HEIGHT = 120, 20
 GRAVITY, JUMP_POWER, PLAYER_SPEED = 0.4, 10, 6
 FPS, PLATFORM_GAP = 60, 80
+PLATFORM_COUNT = 16
 
 # Colors
 WHITE, BLACK = (255, 255, 255), (0, 0, 0)
@@ -46,78 +57,63 @@ sound_enabled = True
 sound_files = ["jump.wav", "boost.wav", "land.wav", "gameover.wav", "background.wav"]
 sounds_exist = os.path.exists("sounds") and all(os.path.exists(os.path.join("sounds", f)) for f in sound_files)
 
+effects = {}
+
 if not sounds_exist:
     print("Sound files not found. Run generate_sounds.py first to create sound effects.")
     sound_enabled = False
 else:
     try:
-        jump_sound = pygame.mixer.Sound(os.path.join("sounds", "jump.wav"))
-        jump_sound.set_volume(0.7)
-        boost_sound = pygame.mixer.Sound(os.path.join("sounds", "boost.wav"))
-        boost_sound.set_volume(0.8)
-        land_sound = pygame.mixer.Sound(os.path.join("sounds", "land.wav"))
-        land_sound.set_volume(0.6)
-        game_over_sound = pygame.mixer.Sound(os.path.join("sounds", "gameover.wav"))
-        game_over_sound.set_volume(0.9)
+        for name, file, volume in [("jump", "jump.wav", 0.7), ("boost", "boost.wav", 0.8),
+                                   ("land", "land.wav", 0.6), ("game_over", "gameover.wav", 0.9)]:
+            effects[name] = pygame.mixer.Sound(os.path.join("sounds", file))
+            effects[name].set_volume(volume)
         pygame.mixer.music.load(os.path.join("sounds", "background.wav"))
         pygame.mixer.music.set_volume(0.5)
-        pygame.mixer.music.play(-1)
-    except Exception as e:
+    except pygame.error as e:
         print(f"Error loading sounds: {e}")
         sound_enabled = False
+sounds = SoundDispatcher(PLATFORMER_GROUPS, PLATFORMER_SOUNDS, effects.get, enabled=sound_enabled)
+sounds.play_music()
 
 # Game variables
 player_pos = [WIDTH // 2, HEIGHT - 100]
 player_radius = PLAYER_SIZE // 2
-platforms = []
+platforms = PlatformPool(PLATFORM_COUNT, PLATFORM_WIDTH, PLATFORM_HEIGHT)  # Recycled slots, sorted by height
+level = LevelGenerator((50, WIDTH - PLATFORM_WIDTH - 50))  # Seeded layout, generated ahead on a worker thread
 player_velocity_y = 0
 score = 0
 game_over = False
 font = pygame.font.SysFont(None, 36)
+text_cache = TextCache()  # HUD strings are rendered once and reused
+
+# Game over screen: the dimming layer is built once, the score label re-renders only when it changes
+game_over_screen = Panel((0, 0, WIDTH, HEIGHT), (0, 0, 0, 128), composite=False)
+game_over_screen.add(Label((WIDTH // 2 - 180, HEIGHT // 2), "GAME OVER! Press R to restart", font))
+final_score_label = game_over_screen.add(Label((WIDTH // 2 - 80, HEIGHT // 2 + 40), "", font))
+
+profiler = profiler_from_argv(PLATFORMER_PHASES, sys.argv)
 boost_jumps = 3
 on_ground = False
-visited_platforms = set()
 show_sound_status = True
 sound_status_timer = 180
-particles = []
+particles = ParticlePool()
 
-class Particle:
-    def __init__(self, x, y):
-        self.x, self.y = x, y
-        self.vx = random.uniform(-1, 1)
-        self.vy = random.uniform(-2, 0)
-        self.radius = random.randint(2, 6)
-        self.color = (random.randint(200, 255), random.randint(100, 200), 0)
-        self.lifetime = random.randint(20, 40)
-    
-    def update(self):
-        self.x += self.vx
-        self.y += self.vy
-        self.vy += 0.05
-        self.lifetime -= 1
-        if self.lifetime < 10:
-            self.radius *= 0.9
-    
-    def draw(self, surface):
-        if self.radius > 0.5:
-            pygame.draw.circle(surface, self.color, (int(self.x), int(self.y)), int(self.radius))
+# Pre-rendered ball and orbs, queued with the HUD text and drawn a layer at a time with Surface.blits
+sprites = SpriteBatch()
+sprites.circle("ball", RED, player_radius)
+sprites.circle("shine", (255, 200, 200), int(player_radius * 0.25))
+sprites.define("boost_orb", (24, 24), paint_boost_orb, anchor=(2, 2))
 
 def create_platforms():
-    platforms.append(pygame.Rect(WIDTH // 2 - PLATFORM_WIDTH // 2, HEIGHT - 50, PLATFORM_WIDTH, PLATFORM_HEIGHT))
-    for i in range(15):
-        x = random.randint(50, WIDTH - PLATFORM_WIDTH - 50)
+    platforms.spawn(WIDTH // 2 - PLATFORM_WIDTH // 2, HEIGHT - 50)
+    for i in range(PLATFORM_COUNT - 1):
+        x = level.next_platform().x
         y = HEIGHT - 150 - i * PLATFORM_GAP
-        platforms.append(pygame.Rect(x, y, PLATFORM_WIDTH, PLATFORM_HEIGHT))
+        platforms.spawn(x, y)
 
 create_platforms()
 
-def play_sound(sound):
-    if sound_enabled and sound is not None:
-        try:
-            sound.play()
-        except:
-            pass
-
 def update_background(time):
     screen.blit(background, (0, 0))
     for star in stars:
@@ -126,32 +122,28 @@ def update_background(time):
         pygame.draw.circle(screen, (brightness, brightness, brightness), (int(x), int(y)), size)
 
 def restart_game():
-    global player_pos, platforms, player_velocity_y, score, game_over, boost_jumps, on_ground, visited_platforms, particles
+    global player_pos, player_velocity_y, score, game_over, boost_jumps, on_ground
     player_pos = [WIDTH // 2, HEIGHT - 100]
-    platforms = []
+    platforms.clear()
+    level.reset()
     player_velocity_y = 0
     score = 0
     game_over = False
     boost_jumps = 3
     on_ground = False
-    visited_platforms = set()
-    particles = []
+    particles.clear()
     create_platforms()
-    if sound_enabled:
-        try:
-            if not pygame.mixer.music.get_busy():
-                pygame.mixer.music.play(-1)
-        except:
-            pass
+    sounds.play_music()
 
 def main():
-    global player_velocity_y, score, game_over, boost_jumps, on_ground, visited_platforms, player_pos, particles
+    global player_velocity_y, score, game_over, boost_jumps, on_ground, player_pos
     global show_sound_status, sound_status_timer, sound_enabled
     
     running = True
     time_passed = 0
     
     while running:
+        profiler.begin_frame()
         time_passed += 0.1
         
         # Event handling
@@ -164,16 +156,16 @@ def main():
                 if event.key == pygame.K_SPACE and not game_over and boost_jumps > 0 and not on_ground:
                     player_velocity_y = -JUMP_POWER
                     boost_jumps -= 1
-                    particles.extend([Particle(player_pos[0], player_pos[1] + player_radius) for _ in range(20)])
-                    play_sound(boost_sound)
+                    particles.emit(player_pos[0], player_pos[1] + player_radius, 20)
+                    sounds.trigger("boost")
+                if event.key == TOGGLE_KEY:
+                    profiler.toggle()
                 if event.key == pygame.K_m:
                     sound_enabled = not sound_enabled
                     show_sound_status = True
                     sound_status_timer = 180
-                    try:
-                        pygame.mixer.music.play(-1) if sound_enabled else pygame.mixer.music.stop()
-                    except:
-                        pass
+                    sounds.set_enabled(sound_enabled)
+        profiler.lap("events")
         
         if not game_over:
             # Player movement
@@ -193,35 +185,33 @@ def main():
             player_velocity_y += GRAVITY
             player_pos[1] += player_velocity_y
             on_ground = False
+            profiler.lap("physics")
             
             # Platform collision
             if player_velocity_y > 0:
-                for platform in platforms:
-                    if (player_pos[1] + player_radius >= platform.top and 
-                        player_pos[1] + player_radius <= platform.top + 15 and
-                        player_pos[0] + player_radius > platform.left + 5 and
+                feet = player_pos[1] + player_radius
+                # The window reaches back to where this step's fall began, so a fast fall can't skip a platform
+                for handle in platforms.between(feet - max(15, player_velocity_y), feet):
+                    platform = platforms.resolve(handle)
+                    if (player_pos[0] + player_radius > platform.left + 5 and
                         player_pos[0] - player_radius < platform.right - 5):
                         player_pos[1] = platform.top - player_radius
                         player_velocity_y = -JUMP_POWER
                         on_ground = True
-                        play_sound(jump_sound)
+                        sounds.trigger("jump")
                         
-                        platform_id = id(platform)
-                        if platform_id not in visited_platforms:
-                            visited_platforms.add(platform_id)
+                        if platforms.visit(handle):
                             score += 1
-                            play_sound(land_sound)
+                            sounds.trigger("land")
                             if score % 5 == 0:
                                 boost_jumps = min(boost_jumps + 1, 3)
+            profiler.lap("collision")
             
             # Game over check
             if player_pos[1] - player_radius > HEIGHT:
                 game_over = True
-                play_sound(game_over_sound)
-                try:
-                    pygame.mixer.music.stop()
-                except:
-                    pass
+                sounds.trigger("game_over")
+                sounds.stop_music()
             
             # Screen scrolling
             if player_pos[1] < HEIGHT // 2:
@@ -229,16 +219,11 @@ def main():
                 player_pos[1] += scroll_speed
                 
                 # Update platforms
-                for platform in platforms[:]:
-                    platform.y += scroll_speed
-                    if platform.top > HEIGHT:
-                        platform_id = id(platform)
-                        if platform_id in visited_platforms:
-                            visited_platforms.remove(platform_id)
-                        platforms.remove(platform)
-                        x = random.randint(50, WIDTH - PLATFORM_WIDTH - 50)
-                        y = min([p.y for p in platforms]) - PLATFORM_GAP
-                        platforms.append(pygame.Rect(x, y, PLATFORM_WIDTH, PLATFORM_HEIGHT))
+                y = platforms.highest().y
+                for _ in range(platforms.scroll(scroll_speed, HEIGHT)):
+                    x = level.next_platform().x
+                    y -= PLATFORM_GAP
+                    platforms.spawn(x, y)
                 
                 # Update stars with parallax
                 for star in stars:
@@ -246,25 +231,24 @@ def main():
                     if star[1] > HEIGHT:
                         star[1] = 0
                         star[0] = random.randint(0, WIDTH)
+            profiler.lap("scroll")
+        sounds.flush()  # One voice per sound triggered this frame
         
         # Update particles
-        for particle in particles[:]:
-            particle.update()
-            if particle.lifetime <= 0:
-                particles.remove(particle)
+        particles.update()
+        profiler.lap("particles")
         
         # Drawing
         update_background(time_passed)
+        profiler.lap("background")
         
         # Draw particles
-        for particle in particles:
-            particle.draw(screen)
+        particles.draw(screen)
         
-        # Draw player
-        pygame.draw.circle(screen, RED, (int(player_pos[0]), int(player_pos[1])), player_radius)
-        pygame.draw.circle(screen, (255, 200, 200), 
-                          (int(player_pos[0] - player_radius * 0.3), int(player_pos[1] - player_radius * 0.3)), 
-                          int(player_radius * 0.25))
+        # Draw player, under the platforms
+        sprites.add("ball", (int(player_pos[0]), int(player_pos[1])))
+        sprites.add("shine", (int(player_pos[0] - player_radius * 0.3), int(player_pos[1] - player_radius * 0.3)))
+        sprites.flush(screen)
         
         # Draw platforms
         for platform in platforms:
@@ -275,40 +259,40 @@ def main():
                             (platform.left, platform.top), (platform.right, platform.top), 2)
         
         # Draw UI
-        screen.blit(font.render(f"Score: {score}", True, WHITE), (10, 10))
-        screen.blit(font.render("Boosts:", True, WHITE), (WIDTH - 120, 20))
+        sprites.blit(text_cache.render(font, f"Score: {score}", True, WHITE), (10, 10))
+        sprites.blit(text_cache.render(font, "Boosts:", True, WHITE), (WIDTH - 120, 20))
         
         for i in range(boost_jumps):
-            boost_x = WIDTH - 30 - i*25
-            boost_y = 20
-            pygame.draw.circle(screen, (255, 200, 100), (boost_x + 10, boost_y + 10), 12)
-            pygame.draw.circle(screen, ORANGE, (boost_x + 10, boost_y + 10), 8)
-            pygame.draw.circle(screen, (255, 255, 200), (boost_x + 7, boost_y + 7), 3)
+            sprites.add("boost_orb", (WIDTH - 30 - i*25, 20))
         
         # Instructions
         if score < 3:
-            screen.blit(font.render("Use LEFT/RIGHT to move, SPACE for boost jump", True, YELLOW), (WIDTH // 2 - 250, 40))
-            screen.blit(font.render("Press M to toggle sound", True, YELLOW), (WIDTH // 2 - 100, 70))
+            sprites.blit(text_cache.render(font, "Use LEFT/RIGHT to move, SPACE for boost jump", True, YELLOW), (WIDTH // 2 - 250, 40))
+            sprites.blit(text_cache.render(font, "Press M to toggle sound", True, YELLOW), (WIDTH // 2 - 100, 70))
+        sprites.flush(screen)
         
         # Sound status
         if show_sound_status:
             status = "ON" if sound_enabled else "OFF"
-            screen.blit(font.render(f"Sound: {status}", True, WHITE), (WIDTH // 2 - 50, HEIGHT - 40))
+            screen.blit(text_cache.render(font, f"Sound: {status}", True, WHITE), (WIDTH // 2 - 50, HEIGHT - 40))
             sound_status_timer -= 1
             if sound_status_timer <= 0:
                 show_sound_status = False
         
         # Game over screen
         if game_over:
-            overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, 128))
-            screen.blit(overlay, (0, 0))
-            screen.blit(font.render("GAME OVER! Press R to restart", True, WHITE), (WIDTH // 2 - 180, HEIGHT // 2))
-            screen.blit(font.render(f"Final Score: {score}", True, WHITE), (WIDTH // 2 - 80, HEIGHT // 2 + 40))
+            final_score_label.set_text(f"Final Score: {score}")
+            game_over_screen.draw(screen)
         
+        profiler.draw(screen)
+        profiler.lap("draw")
         pygame.display.flip()
+        profiler.lap("flip")
+        profiler.end_frame()
         clock.tick(FPS)
     
+    profiler.close()
+    sounds.report()
     pygame.quit()
     sys.exit()
 
@@ -0,0 +1,238 @@
+import random
+import sys
+import time
+
+from level_generator import LevelGenerator
+from platform_pool import PlatformPool
+
+# Game constants (same values as the platformer games)
+WIDTH, HEIGHT = 800, 600
+PLAYER_SIZE = 40
+PLATFORM_WIDTH, PLATFORM_HEIGHT = 120, 20
+GRAVITY, JUMP_POWER, PLAYER_SPEED = 0.4, 10, 6
+FPS, PLATFORM_GAP = 60, 80
+PLATFORM_COUNT = 16  # Starting platform plus 15 above it; every platform that leaves is replaced
+SCROLL_SPEED = 4
+MAX_BOOST_JUMPS = 3
+LANDING_WINDOW = 15  # How far below a platform top the ball may sink and still land
+EDGE_MARGIN = 5  # Forgiving overlap at both platform edges
+PLATFORM_X_RANGE = (50, WIDTH - PLATFORM_WIDTH - 50)  # Where a platform's left edge may be placed
+
+# One simulation step always covers the same amount of game time
+DT = 1.0 / FPS
+
+# Input bits for a single step
+INPUT_LEFT = 1
+INPUT_RIGHT = 2
+INPUT_BOOST = 4  # Edge triggered: set only on the step the key was pressed
+
+
+class PlatformerSim:
+    """Headless platformer physics, advanced one fixed step at a time.
+
+    Holds everything that decides the outcome of a run (player, platforms,
+    score, boosts) and nothing that only affects the picture, so it runs
+    without a window or mixer.
+
+    Platform positions come from a LevelGenerator seeded with the run's seed,
+    so a replay lays out the same level. Pass threaded=True to have its
+    worker build the chunks ahead, keeping generation out of step(); headless
+    users leave it off and build each chunk when it is first needed.
+    """
+
+    def __init__(self, seed=None, threaded=False):
+        self.seed = seed
+        self.level = LevelGenerator(PLATFORM_X_RANGE, seed, threaded=threaded)
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self.seed = seed
+        self.level.reset(self.seed)
+        self.player_pos = [WIDTH // 2, HEIGHT - 100]
+        self.player_radius = PLAYER_SIZE // 2
+        self.player_velocity_y = 0
+        self.platforms = PlatformPool(PLATFORM_COUNT, PLATFORM_WIDTH, PLATFORM_HEIGHT)
+        self.score = 0
+        self.boost_jumps = MAX_BOOST_JUMPS
+        self.on_ground = False
+        self.game_over = False
+        self.steps = 0
+        self.scrolled = 0  # Pixels scrolled during the last step
+        self.create_platforms()
+
+    def create_platforms(self):
+        # Starting platform directly under the player
+        self.platforms.spawn(WIDTH // 2 - PLATFORM_WIDTH // 2, HEIGHT - 50)
+        for i in range(PLATFORM_COUNT - 1):
+            x = self.level.next_platform().x
+            y = HEIGHT - 150 - i * PLATFORM_GAP
+            self.platforms.spawn(x, y)
+
+    def close(self):
+        """Stop the level generator's worker, if it has one."""
+        self.level.close()
+
+    def snapshot(self):
+        """Everything that decides how the run continues, as plain comparable values."""
+        platforms = self.platforms
+        return (self.steps, self.score, self.boost_jumps, self.game_over, self.on_ground,
+                tuple(self.player_pos), self.player_velocity_y,
+                tuple((platforms.rects[slot].x, platforms.rects[slot].y, bool(platforms.visited >> slot & 1))
+                      for slot in map(platforms.slot_at, range(len(platforms) - 1, -1, -1))),
+                self.level.position())
+
+    def step(self, inputs=0):
+        """Advance the game by one DT and return the list of events it produced.
+
+        Events are plain strings ("boost", "jump", "land", "game_over") so the
+        caller can attach sounds and particles without the sim knowing about them.
+        """
+        events = []
+        self.scrolled = 0
+        if self.game_over:
+            return events
+        self.steps += 1
+
+        # Boost jump with limited uses
+        if inputs & INPUT_BOOST and self.boost_jumps > 0 and not self.on_ground:
+            self.player_velocity_y = -JUMP_POWER
+            self.boost_jumps -= 1
+            events.append("boost")
+
+        # Player movement
+        pos = self.player_pos
+        radius = self.player_radius
+        if inputs & INPUT_LEFT:
+            pos[0] -= PLAYER_SPEED
+        if inputs & INPUT_RIGHT:
+            pos[0] += PLAYER_SPEED
+
+        # Wrap around screen edges
+        if pos[0] - radius > WIDTH:
+            pos[0] = -radius
+        elif pos[0] + radius < 0:
+            pos[0] = WIDTH + radius
+
+        # Apply gravity
+        self.player_velocity_y += GRAVITY
+        pos[1] += self.player_velocity_y
+        self.on_ground = False
+
+        # Check for platform collisions (only when falling), against the
+        # platforms whose top is within the landing window of the ball's bottom.
+        # The window reaches back to where the bottom was at the start of the
+        # step, so a fall faster than the window can't pass through a platform
+        if self.player_velocity_y > 0:
+            feet = pos[1] + radius
+            platforms = self.platforms
+            for handle in platforms.between(feet - max(LANDING_WINDOW, self.player_velocity_y), feet):
+                platform = platforms.resolve(handle)
+                if (pos[0] + radius > platform.left + EDGE_MARGIN and
+                        pos[0] - radius < platform.right - EDGE_MARGIN):
+                    pos[1] = platform.top - radius
+                    self.player_velocity_y = -JUMP_POWER
+                    self.on_ground = True
+                    events.append("jump")
+
+                    # Only score platforms not visited before
+                    if platforms.visit(handle):
+                        self.score += 1
+                        events.append("land")
+                        # Every 5 platforms, get a boost jump back
+                        if self.score % 5 == 0:
+                            self.boost_jumps = min(self.boost_jumps + 1, MAX_BOOST_JUMPS)
+
+        # Check if player fell off the bottom
+        if pos[1] - radius > HEIGHT:
+            self.game_over = True
+            events.append("game_over")
+
+        # Scroll the world when player reaches upper half
+        if pos[1] < HEIGHT // 2:
+            pos[1] += SCROLL_SPEED
+            self.scrolled = SCROLL_SPEED
+            highest_y = self.platforms.highest().y  # Before this step's scroll
+            for _ in range(self.platforms.scroll(SCROLL_SPEED, HEIGHT)):
+                # Recycle the freed slot above the highest platform; it joins the scroll next step
+                highest_y -= PLATFORM_GAP
+                self.platforms.spawn(self.level.next_platform().x, highest_y)
+
+        return events
+
+
+class FixedTimestep:
+    """Turns variable frame times into a whole number of fixed sim steps."""
+
+    def __init__(self, dt=DT, max_steps=5):
+        self.dt = dt
+        self.max_steps = max_steps  # Drop time instead of spiralling after a long stall
+        self.accumulator = 0.0
+
+    def advance(self, elapsed):
+        """Add elapsed seconds and return how many steps to run now."""
+        self.accumulator += elapsed
+        steps = int(self.accumulator / self.dt)
+        if steps > self.max_steps:
+            steps = self.max_steps
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= steps * self.dt
+        return steps
+
+
+def random_inputs(rng):
+    """Mostly steer, sometimes boost; good enough to exercise every rule."""
+    inputs = rng.choice((0, INPUT_LEFT, INPUT_RIGHT, INPUT_RIGHT))
+    if rng.random() < 0.01:
+        inputs |= INPUT_BOOST
+    return inputs
+
+
+def follow_inputs(sim, rng):
+    """Steer toward the highest platform the current jump can reach, with a little noise."""
+    x, vy = sim.player_pos[0], sim.player_velocity_y
+    feet = sim.player_pos[1] + sim.player_radius
+    apex = feet - vy * vy / (2 * GRAVITY) if vy < 0 else feet
+    reachable = [p for p in sim.platforms if apex <= p.top < feet]
+    below = [p for p in sim.platforms if p.top >= feet]
+    if reachable:
+        target = min(reachable, key=lambda p: p.top)
+    elif below:
+        target = min(below, key=lambda p: p.top)
+    else:
+        return random_inputs(rng)
+    inputs = 0
+    if x < target.centerx - PLAYER_SPEED:
+        inputs = INPUT_RIGHT
+    elif x > target.centerx + PLAYER_SPEED:
+        inputs = INPUT_LEFT
+    # Spend a boost when falling past the bottom of the screen's lower quarter
+    if vy > 0 and feet > HEIGHT * 3 // 4 and not below:
+        inputs |= INPUT_BOOST
+    if rng.random() < 0.05:
+        inputs = random_inputs(rng)
+    return inputs
+
+
+def run_headless(steps, seed=0):
+    """Play random runs back to back for the given number of steps."""
+    sim = PlatformerSim(seed)
+    rng = random.Random(seed)
+    runs, best = 1, 0
+    for _ in range(steps):
+        sim.step(follow_inputs(sim, rng))
+        if sim.game_over:
+            best = max(best, sim.score)
+            runs += 1
+            sim.reset(sim.seed + 1)
+    return runs, max(best, sim.score)
+
+
+if __name__ == "__main__":
+    steps = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    start = time.perf_counter()
+    runs, best = run_headless(steps, seed)
+    elapsed = time.perf_counter() - start
+    print(f"{steps} steps in {elapsed:.2f}s ({steps / elapsed:.0f} steps/s), {runs} runs, best score {best}")
@@ -0,0 +1,62 @@
+class QualityController:
+    """Steps a game down through cosmetic quality tiers to hold its frame budget.
+
+    tiers are names, best quality first; the game decides what each tier
+    skips. Feed update() every frame's busy time (work only, not the frame
+    limiter's wait) and the number of live entities. Once a full window of
+    frames has averaged over budget, quality drops one tier, and the cost
+    per entity that tier was running at is remembered. Quality only comes
+    back up once that cost at today's entity count would fit in headroom *
+    budget, so a cheap tier doesn't bounce straight back to the expensive
+    one it just left.
+
+    The entity count at which each tier first kicked in is kept in
+    kicked_in and logged as it happens.
+    """
+
+    def __init__(self, tiers, budget=1 / 60, window=30, headroom=0.6, log=print):
+        self.tiers = list(tiers)
+        self.budget = budget
+        self.window = window
+        self.headroom = headroom
+        self.log = log
+        self.tier = 0
+        self.frames = 0
+        self.kicked_in = {}  # Tier name -> live entities when it was first needed
+        self.costs = [0.0] * len(self.tiers)  # Seconds per entity each tier last ran over budget at
+        self._total = 0.0
+        self._count = 0
+
+    @property
+    def name(self):
+        return self.tiers[self.tier]
+
+    def update(self, busy, entities):
+        """Record one frame and return the tier to draw the next one at."""
+        self.frames += 1
+        self._total += busy
+        self._count += 1
+        if self._count < self.window:
+            return self.tier
+        average = self._total / self._count
+        self._total, self._count = 0.0, 0
+        if average > self.budget and self.tier < len(self.tiers) - 1:
+            self.costs[self.tier] = average / max(entities, 1)
+            self._change(self.tier + 1, average, entities)
+        elif (self.tier > 0 and average < self.budget * self.headroom and
+              self.costs[self.tier - 1] * entities < self.budget * self.headroom):
+            self._change(self.tier - 1, average, entities)
+        return self.tier
+
+    def _change(self, tier, average, entities):
+        self.tier = tier
+        if tier and self.name not in self.kicked_in:
+            self.kicked_in[self.name] = entities
+        if self.log:
+            self.log(f"Quality -> {self.name} at {entities} entities, frame {self.frames} "
+                     f"({average * 1000:.1f} ms average against {self.budget * 1000:.1f} ms)")
+
+    def report(self):
+        if self.kicked_in:
+            print("Quality tiers first needed at: " +
+                  ", ".join(f"{name} {entities} entities" for name, entities in self.kicked_in.items()))
@@ -0,0 +1,180 @@
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from platformer_sim import (PlatformerSim, WIDTH, HEIGHT, PLAYER_SIZE, PLATFORM_WIDTH, GRAVITY, JUMP_POWER,
+                            PLAYER_SPEED, PLATFORM_GAP, PLATFORM_COUNT, MAX_BOOST_JUMPS, LANDING_WINDOW,
+                            EDGE_MARGIN)
+
+MAX_JUMP_BOOSTS = 2  # Boosts per single jump covered by the envelope; more count as unreachable
+
+LayoutReport = namedtuple("LayoutReport", "reachable boosts_needed difficulty hardest trivial")
+
+
+class JumpEnvelope:
+    """How far the ball can travel sideways between two platforms, from the physics alone.
+
+    A jump (or a boost) that has lasted m steps has climbed
+        J*m - g*m*(m+1)/2
+    pixels, so a flight with b boosts is b + 1 of those segments back to back.
+    For every height difference between platforms and every boost count the
+    table holds the last step the ball can still land, falling, within the
+    landing window; sideways reach is that many steps at full speed. Flights
+    that drop more than death_drop below the launch platform are left out,
+    since the camera keeps the launch platform around mid-screen.
+    """
+
+    def __init__(self, gravity=GRAVITY, jump_power=JUMP_POWER, speed=PLAYER_SPEED, death_drop=HEIGHT // 2,
+                 max_rise=400):
+        self.gravity = gravity
+        self.jump_power = jump_power
+        self.speed = speed
+        self.death_drop = death_drop
+        self.h_min, self.h_max = -death_drop, max_rise
+        # Segment lengths that stay above the death line on their own
+        m = np.arange(1, int(4 * jump_power / gravity) + 2)
+        rise = jump_power * m - gravity * m * (m + 1) / 2
+        m, rise = m[rise >= -death_drop], rise[rise >= -death_drop]
+        falling = jump_power - gravity * m < 0  # Landing is only checked while falling
+        window = np.maximum(LANDING_WINDOW, gravity * m - jump_power)  # The game's window covers the whole step's fall
+
+        self.last_step = np.zeros((MAX_JUMP_BOOSTS + 1, self.h_max - self.h_min + 1), dtype=np.int32)
+        starts_n, starts_h = np.zeros(1, dtype=np.int64), np.zeros(1)  # Flight so far, before the last segment
+        for boosts in range(MAX_JUMP_BOOSTS + 1):
+            n = (starts_n[:, None] + m[None, falling]).ravel()
+            h = (starts_h[:, None] + rise[None, falling]).ravel()
+            w = np.broadcast_to(window[None, falling], (len(starts_n), falling.sum())).ravel()
+            self.last_step[boosts] = np.maximum(self._landing_table(n, h, w),
+                                                self.last_step[boosts - 1] if boosts else 0)
+            # Extend every flight by one more unboosted segment, then boost
+            n = (starts_n[:, None] + m[None, :]).ravel()
+            h = (starts_h[:, None] + rise[None, :]).ravel()
+            keep = h >= -death_drop
+            starts_n, starts_h = self._prune(n[keep], h[keep])
+        self.reach = self.last_step * speed
+
+    @staticmethod
+    def _prune(n, h):
+        # Flights ending at the same height only matter through their longest duration
+        order = np.lexsort((-n, np.round(h, 3)))
+        h_sorted = np.round(h[order], 3)
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = h_sorted[1:] != h_sorted[:-1]
+        return n[order][first], h[order][first]
+
+    def _landing_table(self, n, h, window):
+        """Last landing step for each integer height difference d, from flights ending at (n, h).
+
+        The ball lands on a platform d pixels up when its bottom is 0..window
+        pixels below the top, i.e. d - window <= h <= d; window is LANDING_WINDOW,
+        or that step's fall when it is faster.
+        """
+        table = np.zeros(self.h_max - self.h_min + 1, dtype=np.int32)
+        lo = np.ceil(h - 1e-9).astype(np.int64)
+        hi = np.floor(h + window + 1e-9).astype(np.int64)
+        for offset in range(int(np.max(window, initial=LANDING_WINDOW)) + 1):
+            d = lo + offset
+            ok = (d <= hi) & (d >= self.h_min) & (d <= self.h_max)
+            np.maximum.at(table, d[ok] - self.h_min, n[ok].astype(np.int32))
+        return table
+
+    def analyze(self, x, y, boosts=MAX_BOOST_JUMPS):
+        """Score layouts given as (layouts, platforms) arrays of left edges and tops, lowest first.
+
+        Returns a LayoutReport of per-layout arrays: whether every jump can be
+        made with the boosts the game hands out, how many boosts that takes,
+        the mean and worst sideways distance as a fraction of an unboosted
+        jump's reach (above 1 needs a boost), and the share of jumps that need
+        no sideways movement at all.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        rise = np.clip(np.rint(y[:, :-1] - y[:, 1:]).astype(np.int64), self.h_min, self.h_max) - self.h_min
+        # Ball centres that land on a platform span PLATFORM_WIDTH + PLAYER_SIZE - 2 * EDGE_MARGIN,
+        # the same width for every platform, so the windows' gap is the left edges' distance minus that
+        period = WIDTH + PLAYER_SIZE  # Wrapping off one side puts the ball this far across
+        dx = np.abs(x[:, 1:] - x[:, :-1]) % period
+        dx = np.minimum(dx, period - dx)
+        gap = np.maximum(dx - (PLATFORM_WIDTH + PLAYER_SIZE - 2 * EDGE_MARGIN), 0)
+
+        reach = self.reach[:, rise]  # (boosts, layouts, jumps)
+        fits = gap[None] < reach  # Landing windows are open intervals
+        needed = np.where(fits.any(axis=0), fits.argmax(axis=0), MAX_JUMP_BOOSTS + 1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            difficulty = np.where(reach[0] > 0, gap / reach[0], np.inf)
+
+        # Spend boosts jump by jump; one comes back every 5 new platforms, as in the game
+        available = np.full(len(x), boosts)
+        reachable = np.ones(len(x), dtype=bool)
+        for jump in range(needed.shape[1]):
+            available = available - needed[:, jump]
+            reachable &= (available >= 0) & (needed[:, jump] <= MAX_JUMP_BOOSTS)
+            if (jump + 1) % 5 == 0:
+                available = np.minimum(available + 1, MAX_BOOST_JUMPS)
+        return LayoutReport(reachable, needed.sum(axis=1), difficulty.mean(axis=1), difficulty.max(axis=1),
+                            (gap == 0).mean(axis=1))
+
+
+def start_layouts(count, rng, gap=PLATFORM_GAP):
+    """Random layouts built like PlatformerSim.create_platforms(), drawn with NumPy."""
+    x = np.empty((count, PLATFORM_COUNT))
+    x[:, 0] = WIDTH // 2 - PLATFORM_WIDTH // 2
+    x[:, 1:] = rng.integers(50, WIDTH - PLATFORM_WIDTH - 50 + 1, (count, PLATFORM_COUNT - 1))
+    y = np.empty(PLATFORM_COUNT)
+    y[0] = HEIGHT - 50
+    y[1:] = HEIGHT - 150 - np.arange(PLATFORM_COUNT - 1) * gap
+    return x, np.broadcast_to(y, x.shape)
+
+
+def seed_layouts(seeds):
+    """The starting layouts PlatformerSim builds for the given seeds."""
+    x = np.empty((len(seeds), PLATFORM_COUNT))
+    y = np.empty((len(seeds), PLATFORM_COUNT))
+    for row, seed in enumerate(seeds):
+        platforms = list(PlatformerSim(seed).platforms)[::-1]  # Lowest first
+        x[row] = [p.x for p in platforms]
+        y[row] = [p.y for p in platforms]
+    return x, y
+
+
+def summarize(report):
+    print(f"  reachable:   {report.reachable.mean() * 100:.2f}%")
+    print(f"  boosts used: mean {report.boosts_needed.mean():.2f}, max {report.boosts_needed.max()}")
+    finite = report.difficulty[np.isfinite(report.difficulty)]
+    p50, p95 = np.percentile(finite, [50, 95]) if len(finite) else (0, 0)
+    print(f"  difficulty:  p50 {p50:.3f}, p95 {p95:.3f}, trivial jumps {report.trivial.mean() * 100:.1f}%")
+
+
+if __name__ == "__main__":
+    # python reachability.py [layouts] [--seeds=A:B] [--gravity=G] [--jump=J] [--speed=S] [--gap=PX]
+    options = dict(arg[2:].split("=", 1) for arg in sys.argv[1:] if arg.startswith("--"))
+    count = int(next((arg for arg in sys.argv[1:] if not arg.startswith("--")), 1000000))
+    start = time.perf_counter()
+    envelope = JumpEnvelope(gravity=float(options.get("gravity", GRAVITY)),
+                            jump_power=float(options.get("jump", JUMP_POWER)),
+                            speed=float(options.get("speed", PLAYER_SPEED)))
+    print(f"Envelope built in {time.perf_counter() - start:.2f}s; unboosted reach for a "
+          f"{PLATFORM_GAP}px step: {envelope.reach[0, PLATFORM_GAP - envelope.h_min]:.0f}px")
+
+    if "seeds" in options:
+        first, last = map(int, options["seeds"].split(":"))
+        seeds = list(range(first, last))
+        report = envelope.analyze(*seed_layouts(seeds))
+        print(f"Seeds {first}..{last - 1}:")
+        summarize(report)
+        hardest = np.argsort(-report.hardest)[:5]
+        print("  hardest: " + ", ".join(f"{seeds[i]} ({report.hardest[i]:.2f})" for i in hardest))
+        print("  unreachable: " + (", ".join(str(seeds[i]) for i in np.flatnonzero(~report.reachable)) or "none"))
+    else:
+        rng = np.random.default_rng(0)
+        gap = int(options.get("gap", PLATFORM_GAP))
+        batch = 100000
+        start = time.perf_counter()
+        reports = [envelope.analyze(*start_layouts(min(batch, count - done), rng, gap))
+                   for done in range(0, count, batch)]
+        elapsed = time.perf_counter() - start
+        report = LayoutReport(*(np.concatenate(field) for field in zip(*reports)))
+        print(f"{count} random layouts in {elapsed:.2f}s ({count / elapsed * 60 / 1e6:.1f}M layouts/min):")
+        summarize(report)
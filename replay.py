@@ -0,0 +1,143 @@
+import struct
+import sys
+import time
+import zlib
+from collections import namedtuple
+
+from platformer_sim import PlatformerSim
+
+# File layout: FILE_HEADER, then one RUN_HEADER + run-length encoded inputs per run
+MAGIC = b"PLRP"
+VERSION = 2  # 2: platforms come from LevelGenerator chunks, so version 1 layouts no longer replay
+FILE_HEADER = struct.Struct("<4sH")
+RUN_HEADER = struct.Struct("<QIIBII")  # seed, steps, score, game over, state digest, encoded length
+MAX_RUN = 255
+
+Run = namedtuple("Run", "seed inputs score game_over digest")
+
+
+def state_digest(sim):
+    return zlib.crc32(repr(sim.snapshot()).encode())
+
+
+def encode_inputs(inputs):
+    """(input bits, repeat count) byte pairs; held keys compress to almost nothing."""
+    data = bytearray()
+    i = 0
+    while i < len(inputs):
+        value = inputs[i]
+        run = 1
+        while i + run < len(inputs) and inputs[i + run] == value and run < MAX_RUN:
+            run += 1
+        data += bytes((value, run))
+        i += run
+    return bytes(data)
+
+
+def decode_inputs(data):
+    inputs = bytearray()
+    for i in range(0, len(data), 2):
+        inputs += bytes((data[i],)) * data[i + 1]
+    return bytes(inputs)
+
+
+class InputRecorder:
+    """Records the seed and per-step inputs of each run to a file.
+
+    One input byte is kept per sim step (not per frame), so a replay does not
+    depend on how fixed steps happened to fall into frames. Each run is
+    written when finish() is called, together with the final score and a
+    digest of the sim state for the replayer to check against.
+    """
+
+    def __init__(self, path):
+        self.file = open(path, "wb")
+        self.file.write(FILE_HEADER.pack(MAGIC, VERSION))
+        self.seed = None
+        self.inputs = None
+        self.runs = 0
+
+    def start(self, seed):
+        self.seed = seed
+        self.inputs = bytearray()
+
+    def record(self, inputs):
+        if self.inputs is not None:
+            self.inputs.append(inputs)
+
+    def finish(self, sim):
+        """Write the current run, ending in the state `sim` is in now."""
+        if self.inputs is None:
+            return
+        data = encode_inputs(self.inputs)
+        self.file.write(RUN_HEADER.pack(self.seed, len(self.inputs), sim.score, sim.game_over,
+                                        state_digest(sim), len(data)))
+        self.file.write(data)
+        self.file.flush()
+        self.inputs = None
+        self.runs += 1
+
+    def close(self):
+        self.file.close()
+
+
+def read_runs(path):
+    with open(path, "rb") as f:
+        magic, version = FILE_HEADER.unpack(f.read(FILE_HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} input recording")
+        runs = []
+        while True:
+            header = f.read(RUN_HEADER.size)
+            if not header:
+                return runs
+            seed, steps, score, game_over, digest, length = RUN_HEADER.unpack(header)
+            inputs = decode_inputs(f.read(length))
+            if len(inputs) != steps:
+                raise ValueError(f"{path} is truncated")
+            runs.append(Run(seed, inputs, score, bool(game_over), digest))
+
+
+def replay(run):
+    """Play a run back on a fresh sim and return the sim."""
+    sim = PlatformerSim(run.seed)
+    step = sim.step
+    for inputs in run.inputs:
+        step(inputs)
+    return sim
+
+
+def check(run, sim):
+    """Raise AssertionError unless the replayed sim ended where the recording did."""
+    if (sim.score, sim.game_over) != (run.score, run.game_over):
+        raise AssertionError(f"seed {run.seed}: replay ended with score {sim.score} (game over {sim.game_over}), "
+                             f"recording has {run.score} (game over {run.game_over})")
+    if state_digest(sim) != run.digest:
+        raise AssertionError(f"seed {run.seed}: replay state differs from the recording")
+
+
+def record_path_from_argv(argv):
+    """The path given as --record=PATH, if any."""
+    for arg in argv:
+        if arg.startswith("--record="):
+            return arg.split("=", 1)[1]
+    return None
+
+
+if __name__ == "__main__":
+    # Replay a recording as fast as possible: python replay.py session.rec [repeats]
+    if len(sys.argv) < 2:
+        print("Usage: python replay.py RECORDING [REPEATS]")
+        sys.exit(1)
+    runs = read_runs(sys.argv[1])
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    steps = 0
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for run in runs:
+            check(run, replay(run))
+            steps += len(run.inputs)
+    elapsed = time.perf_counter() - start
+    for run in runs:
+        print(f"seed {run.seed}: {len(run.inputs)} steps, score {run.score}, game over {run.game_over}")
+    print(f"{len(runs)} runs OK; {steps} steps in {elapsed:.2f}s ({steps / max(elapsed, 1e-9):.0f} steps/s)")
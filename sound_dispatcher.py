@@ -0,0 +1,158 @@
+import time
+from collections import deque
+
+import pygame
+
+FREQUENCY = 44100  # Matches the files generate_sounds.py writes
+MIXER_BUFFER = 256  # Samples per mixer callback: ~6 ms at 44.1 kHz, against pygame's default 512
+
+# The platformers' channels per sound category, and each sound's (category, priority);
+# bounces share a small group so a burst of them can't crowd out boosts or game over
+PLATFORMER_GROUPS = {"movement": 3, "events": 2}
+PLATFORMER_SOUNDS = {"jump": ("movement", 0), "land": ("movement", 1), "boost": ("events", 2), "game_over": ("events", 3)}
+
+
+def init_mixer(buffer=MIXER_BUFFER):
+    """Ask for a small mixer buffer; must run before pygame.init() or pygame.mixer.init()."""
+    pygame.mixer.pre_init(FREQUENCY, -16, 2, buffer)
+
+
+class SoundDispatcher:
+    """Plays sound effects on reserved channel groups, once per frame.
+
+    groups maps a category to its number of channels, which is also its voice
+    cap; sounds maps a sound name to (category, priority). Games call
+    trigger() as events happen and flush() once per frame: identical triggers
+    within the frame are coalesced into one voice, a free channel in the
+    sound's group is used if there is one, and otherwise the group's lowest
+    priority voice (the oldest among equals) is stolen, as long as it is no
+    more important than the new sound. Every group channel is reserved, so
+    nothing else can take them.
+
+    lookup(name) returns the loaded Sound, or None while it is still loading.
+    Latency is recorded from trigger() to the channel starting, plus one
+    mixer buffer, which is when the first samples can reach the device.
+    """
+
+    def __init__(self, groups, sounds, lookup, enabled=True, buffer=MIXER_BUFFER):
+        self.sounds = sounds
+        self.lookup = lookup
+        self.enabled = enabled
+        self.buffer_latency = buffer / FREQUENCY
+        self.latencies = deque(maxlen=1000)  # Seconds, for the most recent voices started
+        self.played = self.coalesced = self.stolen = self.dropped = 0
+        self._pending = {}  # name -> time of the frame's first trigger
+        self.groups = {}
+        self.available = pygame.mixer.get_init() is not None
+        if not self.available:
+            return
+        total = sum(groups.values())
+        pygame.mixer.set_num_channels(max(total, pygame.mixer.get_num_channels()))
+        pygame.mixer.set_reserved(total)
+        first = 0
+        for category, count in groups.items():
+            # Each voice is [channel, priority of what it is playing, start time]
+            self.groups[category] = [[pygame.mixer.Channel(i), 0, 0.0] for i in range(first, first + count)]
+            first += count
+
+    def trigger(self, name):
+        if not self.enabled or not self.available:
+            return
+        if name in self._pending:
+            self.coalesced += 1
+        else:
+            self._pending[name] = time.perf_counter()
+
+    def flush(self):
+        """Start the voices for everything triggered since the last flush."""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        # Most important first, so a burst can't fill a group before they get a channel
+        for name, triggered in sorted(pending.items(), key=lambda item: -self.sounds[item[0]][1]):
+            sound = self.lookup(name)
+            if sound is None:
+                continue
+            category, priority = self.sounds[name]
+            voice = self._voice(self.groups[category], priority)
+            if voice is None:
+                self.dropped += 1
+                continue
+            try:
+                voice[0].play(sound)
+            except pygame.error as e:
+                print(f"Error playing {name}: {e}")
+                continue
+            now = time.perf_counter()
+            voice[1], voice[2] = priority, now
+            self.played += 1
+            self.latencies.append(now - triggered + self.buffer_latency)
+
+    def _voice(self, voices, priority):
+        victim = None
+        for voice in voices:
+            if not voice[0].get_busy():
+                return voice
+            if victim is None or (voice[1], voice[2]) < (victim[1], victim[2]):
+                victim = voice
+        if victim[1] > priority:
+            return None
+        self.stolen += 1
+        return victim
+
+    def set_enabled(self, enabled):
+        """Turn effects and music on or off together."""
+        self.enabled = enabled
+        if enabled:
+            self.play_music(restart=True)
+        else:
+            self._pending.clear()
+            self.stop_music()
+
+    def play_music(self, restart=False):
+        """Loop the loaded music track; unless restart is set, leave it alone if it is already playing."""
+        if not self.enabled or not self.available:
+            return
+        try:
+            if restart or not pygame.mixer.music.get_busy():
+                pygame.mixer.music.play(-1)
+        except pygame.error:
+            pass  # No track loaded yet; the loader starts it when it arrives
+
+    def stop_music(self):
+        if self.available:
+            pygame.mixer.music.stop()
+
+    def report(self):
+        if not self.latencies:
+            return
+        latencies = sorted(self.latencies)
+        p50 = latencies[len(latencies) // 2] * 1000
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000
+        print(f"Sound: {self.played} played, {self.coalesced} coalesced, {self.stolen} stolen, "
+              f"{self.dropped} dropped; latency p50 {p50:.1f} ms, p95 {p95:.1f} ms, max {latencies[-1] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    # A burst of bounces every frame for two seconds, with the other effects on
+    # top, against the real mixer; prints what was played, merged and dropped
+    import os
+    import random
+
+    init_mixer()
+    pygame.mixer.init()
+    loaded = {name: pygame.mixer.Sound(os.path.join("sounds", file)) for name, file in
+              [("jump", "jump.wav"), ("land", "land.wav"), ("boost", "boost.wav"), ("game_over", "gameover.wav")]}
+    dispatcher = SoundDispatcher(PLATFORMER_GROUPS, PLATFORMER_SOUNDS, loaded.get)
+    rng = random.Random(1)
+    for frame in range(120):
+        for _ in range(rng.randint(1, 6)):
+            dispatcher.trigger(rng.choice(["jump", "jump", "land"]))
+        if frame % 10 == 0:
+            dispatcher.trigger("boost")
+        if frame % 40 == 0:
+            dispatcher.trigger("game_over")
+        dispatcher.flush()
+        time.sleep(1 / 60)
+    print(f"Mixer: {pygame.mixer.get_init()}, buffer {MIXER_BUFFER} samples")
+    dispatcher.report()
@@ -2,6 +2,15 @@ import pygame
 import random
 import sys
 
+import numpy as np
+
+from broadphase import overlapping_pairs
+from ecs import World
+from frame_profiler import TOGGLE_KEY, profiler_from_argv
+from quality import QualityController
+from sprite_batch import SpriteBatch
+from swept import sweep_aabb
+
 # Initialize pygame
 pygame.init()
 
@@ -14,6 +23,19 @@ PLAYER_SPEED = 8
 ENEMY_SPEED = 3
 BULLET_SPEED = 10
 FPS = 60
+BULLET_POOL = 128  # A bullet lives HEIGHT / BULLET_SPEED = 60 frames, far fewer than anyone can fire in that time
+ENEMY_POOL = 64  # About 4 enemies are on screen at the 2% spawn rate
+
+# --stress: a bullet-hell load test. The player can't die, and every STRESS_RAMP frames one more
+# enemy and one more bullet are spawned per frame, until tens of thousands are on screen
+STRESS = "--stress" in sys.argv
+STRESS_POOL = 65536
+STRESS_RAMP = 10
+# Cosmetic quality tiers, each shedding more than the last: skip entities not fully on screen,
+# draw a dot per entity instead of a rect, draw only the newest DRAW_CAP of each kind
+QUALITY_TIERS = ["full", "cull", "simple", "capped"]
+CULL, SIMPLE, CAPPED = 1, 2, 3
+DRAW_CAP = 2000
 
 # Colors
 WHITE = (255, 255, 255)
@@ -29,22 +51,141 @@ clock = pygame.time.Clock()
 
 # Player setup
 player = pygame.Rect(WIDTH // 2 - PLAYER_SIZE // 2, HEIGHT - PLAYER_SIZE - 20, PLAYER_SIZE, PLAYER_SIZE)
-bullets = []
-enemies = []
 score = 0
 game_over = False
 font = pygame.font.SysFont(None, 36)
 
-# Game loop
-def main():
+# Bullets and enemies are entities with top-left positions; their sizes are fixed.
+# Both live in fixed pools, so firing and spawning never allocate; a full pool drops the spawn
+world = World()
+bullets = world.archetype("bullets", capacity=STRESS_POOL if STRESS else BULLET_POOL, fixed=True, x=np.int32, y=np.int32)
+enemies = world.archetype("enemies", capacity=STRESS_POOL if STRESS else ENEMY_POOL, fixed=True, x=np.int32, y=np.int32)
+stress_rng = np.random.default_rng(0)
+
+# The ship, bullets and enemies are rasterized once; draw() queues them and blits the frame in one call
+sprites = SpriteBatch()
+sprites.define("ship", (PLAYER_SIZE + 1, PLAYER_SIZE + 1), lambda surface: pygame.draw.polygon(
+    surface, GREEN, [(PLAYER_SIZE // 2, 0), (0, PLAYER_SIZE), (PLAYER_SIZE, PLAYER_SIZE)]))
+sprites.rect("bullet", BLUE, (BULLET_SIZE, BULLET_SIZE * 2))
+sprites.rect("enemy", RED, (ENEMY_SIZE, ENEMY_SIZE))
+stress_frames = 0
+
+def move_bullets(world):
+    if STRESS:
+        # A wall of bullets from the bottom, spawned before the move like the player's shots,
+        # so collide() sweeps them from where they really started
+        count = 1 + stress_frames // STRESS_RAMP
+        bullets.spawn_many(count, x=stress_rng.integers(0, WIDTH - BULLET_SIZE + 1, count), y=HEIGHT)
+    bullets["y"] -= BULLET_SPEED
+    bullets.remove(np.less(bullets["y"], 0, out=bullets.mask()))
+
+def spawn_enemies(world):
+    global stress_frames
+    if STRESS:
+        # Enemies along the top, to meet the bullets move_bullets sends up
+        stress_frames += 1
+        count = 1 + stress_frames // STRESS_RAMP
+        enemies.spawn_many(count, x=stress_rng.integers(0, WIDTH - ENEMY_SIZE + 1, count), y=-ENEMY_SIZE)
+    elif random.random() < 0.02:  # 2% chance each frame to create a new enemy
+        create_enemy()
+
+def move_enemies(world):
+    enemies["y"] += ENEMY_SPEED
+    # Culled before collide() runs, so an enemy can't leave the screen and be shot in the same frame
+    enemies.remove(np.greater(enemies["y"], HEIGHT, out=enemies.mask()))
+
+def collide(world):
     global score, game_over
+    ex, ey = enemies["x"], enemies["y"]
+    if not STRESS and ((ex < player.right) & (ex + ENEMY_SIZE > player.left) &
+            (ey < player.bottom) & (ey + ENEMY_SIZE > player.top)).any():
+        game_over = True
+    if not len(bullets) or not len(enemies):
+        return
+    # Swept over the frame, so no speed lets a bullet skip through an enemy between two frames.
+    # Enemies moved down ENEMY_SPEED and bullets up BULLET_SPEED: the broadphase pairs up the
+    # areas they covered on the way, and sweep_aabb keeps the pairs that were there at the same time
+    bx, by = bullets["x"], bullets["y"]
+    hit_enemies, hit_bullets = overlapping_pairs(ex, ey - ENEMY_SPEED, ENEMY_SIZE, ENEMY_SIZE + ENEMY_SPEED,
+                                                 bx, by, BULLET_SIZE, BULLET_SIZE * 2 + BULLET_SPEED)
+    met = np.isfinite(sweep_aabb(ex[hit_enemies], ey[hit_enemies] - ENEMY_SPEED, ENEMY_SIZE, ENEMY_SIZE,
+                                 0, ENEMY_SPEED + BULLET_SPEED,
+                                 bx[hit_bullets], by[hit_bullets] + BULLET_SPEED, BULLET_SIZE, BULLET_SIZE * 2))
+    hit_enemies, hit_bullets = hit_enemies[met], hit_bullets[met]
+    if not len(hit_enemies):
+        return
+    # Each enemy, in spawn order, takes the first bullet that hits it and is still flying;
+    # the pairs come sorted that way, and both sides are removed once, together, below
+    dead_enemies = enemies.mask()
+    dead_bullets = bullets.mask()
+    for enemy, bullet in zip(hit_enemies.tolist(), hit_bullets.tolist()):
+        if not dead_enemies[enemy] and not dead_bullets[bullet]:
+            dead_enemies[enemy] = dead_bullets[bullet] = True
+            score += 10
+    enemies.remove(dead_enemies)
+    bullets.remove(dead_bullets)
+
+def draw(world):
+    screen.fill(BLACK)
+    
+    # Draw player (as a triangle spaceship)
+    if not game_over:
+        sprites.add("ship", player.topleft)
+    
+    # Draw bullets and enemies
+    tier = quality.tier if quality else 0
+    if tier >= SIMPLE:
+        sprites.flush(screen)  # Dots go straight to the screen, so the ship has to be there first
+    draw_entities(bullets, "bullet", BULLET_SIZE, BULLET_SIZE * 2, BLUE, tier)
+    draw_entities(enemies, "enemy", ENEMY_SIZE, ENEMY_SIZE, RED, tier)
     
+    # Draw score
+    score_text = font.render(f"Score: {score}", True, WHITE)
+    sprites.blit(score_text, (10, 10))
+    
+    # Draw game over
+    if game_over:
+        game_over_text = font.render("GAME OVER! Press R to restart", True, WHITE)
+        sprites.blit(game_over_text, (WIDTH // 2 - 180, HEIGHT // 2))
+    sprites.flush(screen)
+
+def draw_entities(archetype, sprite, width, height, color, tier):
+    xs, ys = archetype["x"], archetype["y"]
+    if tier >= CULL:
+        on_screen = (ys >= 0) & (ys + height <= HEIGHT)  # x never leaves the screen
+        xs, ys = xs[on_screen], ys[on_screen]
+    if tier >= CAPPED:
+        xs, ys = xs[-DRAW_CAP:], ys[-DRAW_CAP:]
+    if tier >= SIMPLE:
+        # A 3x3 dot at each centre, all written through one pixel array instead of a draw call each
+        pixels = pygame.surfarray.pixels2d(screen)
+        offsets = np.array([-1, 0, 1])
+        pixels[(xs + width // 2)[:, None, None] + offsets[:, None],
+               (ys + height // 2)[:, None, None] + offsets] = screen.map_rgb(color)
+        del pixels  # Unlocks the screen
+        return
+    sprites.add_many(sprite, xs, ys)
+
+UPDATE_SYSTEMS = ["bullets", "spawn", "enemies", "collision"]
+world.add_system("bullets", move_bullets)
+world.add_system("spawn", spawn_enemies)
+world.add_system("enemies", move_enemies)
+world.add_system("collision", collide)
+world.add_system("draw", draw)
+
+profiler = profiler_from_argv(["events", "player"] + world.system_names() + ["flip"], sys.argv)  # One phase per system
+world.profiler = profiler
+quality = QualityController(QUALITY_TIERS) if STRESS else None
+
+# Game loop
+def main():
     # Create initial enemies
     for _ in range(5):
         create_enemy()
     
     running = True
     while running:
+        profiler.begin_frame()
         # Event handling
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -52,11 +193,13 @@ def main():
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE and not game_over:
                     # Create a bullet
-                    bullet = pygame.Rect(player.centerx - BULLET_SIZE // 2, player.top, BULLET_SIZE, BULLET_SIZE * 2)
-                    bullets.append(bullet)
+                    bullets.spawn(x=player.centerx - BULLET_SIZE // 2, y=player.top)
                 if event.key == pygame.K_r and game_over:
                     # Restart game
                     restart_game()
+                if event.key == TOGGLE_KEY:
+                    profiler.toggle()
+        profiler.lap("events")
         
         if not game_over:
             # Player movement
@@ -65,78 +208,37 @@ def main():
                 player.x -= PLAYER_SPEED
             if keys[pygame.K_RIGHT] and player.right < WIDTH:
                 player.x += PLAYER_SPEED
+            profiler.lap("player")
             
-            # Update bullets
-            for bullet in bullets[:]:
-                bullet.y -= BULLET_SPEED
-                if bullet.y < 0:
-                    bullets.remove(bullet)
-            
-            # Update enemies
-            if random.random() < 0.02:  # 2% chance each frame to create a new enemy
-                create_enemy()
-                
-            for enemy in enemies[:]:
-                enemy.y += ENEMY_SPEED
-                if enemy.y > HEIGHT:
-                    enemies.remove(enemy)
-                    
-                # Check for collisions with bullets
-                for bullet in bullets[:]:
-                    if enemy.colliderect(bullet):
-                        enemies.remove(enemy)
-                        bullets.remove(bullet)
-                        score += 10
-                        break
-                
-                # Check for collision with player
-                if enemy.colliderect(player):
-                    game_over = True
+            # Bullets, enemies and collisions, each over whole arrays
+            world.update(UPDATE_SYSTEMS)
         
         # Drawing
-        screen.fill(BLACK)
-        
-        # Draw player (as a triangle spaceship)
-        if not game_over:
-            pygame.draw.polygon(screen, GREEN, [
-                (player.centerx, player.top),
-                (player.left, player.bottom),
-                (player.right, player.bottom)
-            ])
-        
-        # Draw bullets
-        for bullet in bullets:
-            pygame.draw.rect(screen, BLUE, bullet)
-        
-        # Draw enemies
-        for enemy in enemies:
-            pygame.draw.rect(screen, RED, enemy)
-        
-        # Draw score
-        score_text = font.render(f"Score: {score}", True, WHITE)
-        screen.blit(score_text, (10, 10))
-        
-        # Draw game over
-        if game_over:
-            game_over_text = font.render("GAME OVER! Press R to restart", True, WHITE)
-            screen.blit(game_over_text, (WIDTH // 2 - 180, HEIGHT // 2))
+        world.update(["draw"])
+        profiler.draw(screen)
         
         pygame.display.flip()
+        profiler.lap("flip")
+        profiler.end_frame()
+        if quality:
+            quality.update(profiler.current.sum(), len(bullets) + len(enemies))
         clock.tick(FPS)
     
+    profiler.close()
+    world.report()
+    if quality:
+        quality.report()
     pygame.quit()
     sys.exit()
 
 def create_enemy():
     x = random.randint(0, WIDTH - ENEMY_SIZE)
-    enemy = pygame.Rect(x, -ENEMY_SIZE, ENEMY_SIZE, ENEMY_SIZE)
-    enemies.append(enemy)
+    enemies.spawn(x=x, y=-ENEMY_SIZE)
 
 def restart_game():
-    global player, bullets, enemies, score, game_over
+    global player, score, game_over
     player = pygame.Rect(WIDTH // 2 - PLAYER_SIZE // 2, HEIGHT - PLAYER_SIZE - 20, PLAYER_SIZE, PLAYER_SIZE)
-    bullets = []
-    enemies = []
+    world.clear()
     score = 0
     game_over = False
     for _ in range(5):
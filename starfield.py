@@ -0,0 +1,109 @@
+import math
+import os
+import random
+import sys
+import time
+
+import numpy as np
+import pygame
+
+TWINKLE_PHASES = 256  # Steps per full twinkle cycle in the brightness table
+MAX_STAR_SIZE = 3
+
+
+class Starfield:
+    """Twinkling, scrolling stars kept in NumPy arrays and drawn with one Surface.blits call.
+
+    layers is a list of (star count, parallax) pairs; parallax is how far a
+    layer moves per pixel of scroll, so distant layers use smaller values.
+    Brightness comes from a table indexed by (twinkle phase, base brightness),
+    and each (size, brightness) pair has its own pre-rendered sprite.
+    """
+
+    def __init__(self, width, height, layers=((100, 0.7),), seed=None):
+        self.width, self.height = width, height
+        self.rng = np.random.default_rng(seed)
+        count = sum(n for n, _ in layers)
+        rng = self.rng
+        self.x = rng.integers(0, width + 1, count).astype(np.float32)
+        self.y = rng.integers(0, height + 1, count).astype(np.float32)
+        self.size = rng.integers(1, MAX_STAR_SIZE + 1, count).astype(np.int32)
+        self.base_brightness = rng.integers(100, 256, count).astype(np.int32)
+        # Twinkle speed and offset pre-scaled to table steps
+        self.twinkle_speed = (rng.uniform(0.01, 0.05, count) * TWINKLE_PHASES / (2 * math.pi)).astype(np.float32)
+        self.twinkle_offset = rng.uniform(0, TWINKLE_PHASES, count).astype(np.float32)
+        self.parallax = np.repeat([p for _, p in layers], [n for n, _ in layers]).astype(np.float32)
+
+        # brightness[phase, base] = clamp(base + int(50 * sin(phase)), 50, 255)
+        wobble = (50 * np.sin(np.arange(TWINKLE_PHASES) * 2 * math.pi / TWINKLE_PHASES)).astype(np.int32)
+        self.brightness = np.clip(np.arange(256)[None, :] + wobble[:, None], 50, 255).astype(np.int32)
+        self._sprites = None  # Built on first draw, once a display exists
+        self._positions = None  # Sprite top-left corners, rebuilt only after the stars move
+
+    def __len__(self):
+        return len(self.x)
+
+    def scroll(self, dy):
+        """Move each layer down by its share of dy; stars that leave the bottom restart at the top."""
+        self.y += dy * self.parallax
+        self._positions = None
+        wrapped = np.flatnonzero(self.y > self.height)
+        if len(wrapped):
+            self.y[wrapped] = 0
+            self.x[wrapped] = self.rng.integers(0, self.width + 1, len(wrapped))
+
+    def _build_sprites(self):
+        # Index is (size - 1) * 256 + brightness
+        sprites = []
+        for size in range(1, MAX_STAR_SIZE + 1):
+            for brightness in range(256):
+                sprite = pygame.Surface((2 * size + 1, 2 * size + 1))
+                sprite.set_colorkey((0, 0, 0))
+                pygame.draw.circle(sprite, (brightness, brightness, brightness), (size, size), size)
+                if pygame.display.get_surface() is not None:
+                    sprite = sprite.convert()
+                sprites.append(sprite)
+        return sprites
+
+    def draw(self, surface, time, dirty=False):
+        """Draw every star at animation time `time`; returns the star rects when dirty is set."""
+        if self._sprites is None:
+            self._sprites = self._build_sprites()
+        if self._positions is None:
+            left = self.x.astype(np.int32) - self.size
+            top = self.y.astype(np.int32) - self.size
+            self._positions = list(zip(left.tolist(), top.tolist()))
+        phase = (time * self.twinkle_speed + self.twinkle_offset).astype(np.int32) % TWINKLE_PHASES
+        keys = (self.size - 1) * 256 + self.brightness[phase, self.base_brightness]
+        sprites = map(self._sprites.__getitem__, keys.tolist())
+        return surface.blits(zip(sprites, self._positions), doreturn=dirty)
+
+
+if __name__ == "__main__":
+    # Compare the old per-star sin + draw.circle loop with the batched starfield
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    frames = 120
+    pygame.init()
+    screen = pygame.display.set_mode((800, 600))
+    stars = [[random.randint(0, 800), random.randint(0, 600), random.randint(1, 3), random.randint(100, 255),
+              random.uniform(0.01, 0.05), random.uniform(0, 2 * math.pi)] for _ in range(100)]
+    start = time.perf_counter()
+    for frame in range(frames):
+        for x, y, size, base, speed, offset in stars:
+            brightness = max(min(base + int(50 * math.sin(frame * 0.1 * speed + offset)), 255), 50)
+            pygame.draw.circle(screen, (brightness, brightness, brightness), (int(x), int(y)), size)
+    old = (time.perf_counter() - start) / frames * 1000
+    field = Starfield(800, 600, layers=((count // 2, 0.3), (count - count // 2, 0.7)), seed=0)
+    field.draw(screen, 0)
+    start = time.perf_counter()
+    for frame in range(frames):
+        field.draw(screen, frame * 0.1)
+    still = (time.perf_counter() - start) / frames * 1000
+    start = time.perf_counter()
+    for frame in range(frames):
+        field.scroll(4)
+        field.draw(screen, frame * 0.1)
+    scrolling = (time.perf_counter() - start) / frames * 1000
+    print(f"100 stars, per-star loop: {old:.2f} ms/frame")
+    print(f"{count} stars, starfield: {still:.2f} ms/frame still, {scrolling:.2f} ms/frame scrolling")
@@ -0,0 +1,48 @@
+from collections import OrderedDict
+
+import pygame
+
+
+class TextCache:
+    """Rendered text surfaces, reused until evicted.
+
+    Keyed by (font, text, antialias, color, background), so a HUD string only
+    goes through glyph rasterization the first time it appears. The least
+    recently used surfaces are dropped once their pixel memory passes
+    max_bytes.
+    """
+
+    def __init__(self, max_bytes=4 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._surfaces = OrderedDict()
+
+    def __len__(self):
+        return len(self._surfaces)
+
+    def clear(self):
+        self._surfaces.clear()
+        self.bytes = 0
+
+    def render(self, font, text, antialias, color, background=None):
+        """Same arguments as font.render(), with the font first."""
+        key = (font, text, antialias, color, background)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color, background)
+        if pygame.display.get_surface() is not None:
+            # Match the display format so blits need no conversion
+            surface = surface.convert_alpha() if surface.get_flags() & pygame.SRCALPHA else surface.convert()
+        self._surfaces[key] = surface
+        self.bytes += surface.get_pitch() * surface.get_height()
+        while self.bytes > self.max_bytes and len(self._surfaces) > 1:
+            _, old = self._surfaces.popitem(last=False)
+            self.bytes -= old.get_pitch() * old.get_height()
+        return surface
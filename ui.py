@@ -0,0 +1,179 @@
+import pygame
+
+from text_cache import TextCache
+
+WHITE = (255, 255, 255)
+
+_text_cache = TextCache(max_bytes=1024 * 1024)
+
+
+class Widget:
+    """A piece of UI drawn from a cached surface.
+
+    render() builds the surface; it runs again only after invalidate(),
+    which widgets call themselves when their text or state changes. Every
+    other frame, drawing a widget is one blit. Positions are relative to the
+    parent Panel, or to the screen for a widget drawn on its own.
+    """
+
+    def __init__(self, rect):
+        self.rect = pygame.Rect(rect)
+        self.parent = None
+        self.renders = 0
+        self._surface = None
+
+    def render(self):
+        raise NotImplementedError
+
+    def invalidate(self):
+        self._surface = None
+        if self.parent is not None:
+            self.parent.invalidate()
+
+    def surface(self):
+        if self._surface is None:
+            self._surface = self.render()
+            self.renders += 1
+        return self._surface
+
+    def draw(self, target, offset=(0, 0)):
+        return target.blit(self.surface(), (self.rect.x + offset[0], self.rect.y + offset[1]))
+
+    def hover(self, pos):
+        pass
+
+    def click(self, pos):
+        """The widget under pos that takes clicks, or None."""
+        return None
+
+
+class Label(Widget):
+    """One line of text; x is its centre when centered is set."""
+
+    def __init__(self, pos, text, font, color=WHITE, centered=False):
+        super().__init__((pos, (0, 0)))
+        self.anchor = pos
+        self.font = font
+        self.color = color
+        self.centered = centered
+        self.text = None
+        self.set_text(text)
+
+    def set_text(self, text):
+        if text == self.text:
+            return
+        self.text = text
+        self.invalidate()
+
+    def render(self):
+        surface = _text_cache.render(self.font, self.text, True, self.color)
+        x, y = self.anchor
+        self.rect.size = surface.get_size()
+        self.rect.topleft = (x - self.rect.width // 2 if self.centered else x, y)
+        return surface
+
+
+class Button(Widget):
+    """A filled, white-bordered button; the normal and hover looks are both kept."""
+
+    def __init__(self, rect, text, font, color, hover_color=None, text_color=WHITE):
+        super().__init__(rect)
+        self.text = text
+        self.font = font
+        self.color = color
+        self.hover_color = hover_color
+        self.text_color = text_color
+        self.hovered = False
+        self._looks = {}  # hovered -> rendered surface
+
+    def set_text(self, text):
+        if text != self.text:
+            self.text = text
+            self._looks.clear()
+            self.invalidate()
+
+    def render(self):
+        look = self._looks.get(self.hovered)
+        if look is None:
+            look = pygame.Surface(self.rect.size)
+            look.fill(self.hover_color if self.hover_color and self.hovered else self.color)
+            pygame.draw.rect(look, WHITE, look.get_rect(), 2)
+            text = _text_cache.render(self.font, self.text, True, self.text_color)
+            look.blit(text, text.get_rect(center=look.get_rect().center))
+            self._looks[self.hovered] = look
+        return look
+
+    def hover(self, pos):
+        hovered = bool(self.rect.collidepoint(pos))
+        if hovered != self.hovered:
+            self.hovered = hovered
+            self.invalidate()
+
+    def click(self, pos):
+        return self if self.rect.collidepoint(pos) else None
+
+
+class Panel(Widget):
+    """A background with widgets on top.
+
+    With composite set, the children are drawn into the panel's own cached
+    surface, so the whole panel is one blit until something in it changes.
+    Translucent overlays over a live scene leave composite off: blending text
+    into a translucent layer first would darken its antialiased edges, so
+    only the background is cached and each child is blitted on its own.
+    """
+
+    def __init__(self, rect, fill, border=None, composite=True):
+        super().__init__(rect)
+        self.fill = fill
+        self.border = border
+        self.composite = composite
+        self.children = []
+        self._background = None
+
+    def add(self, widget):
+        widget.parent = self
+        self.children.append(widget)
+        self.invalidate()
+        return widget
+
+    def invalidate(self):
+        if self.composite:
+            super().invalidate()
+
+    def _render_background(self):
+        if self._background is None:
+            self._background = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+            self._background.fill(self.fill)
+            if self.border:
+                pygame.draw.rect(self._background, self.border, self._background.get_rect(), 2)
+        return self._background
+
+    def render(self):
+        if not self.composite:
+            return self._render_background()
+        surface = self._render_background().copy()
+        for child in self.children:
+            child.draw(surface)
+        return surface
+
+    def draw(self, target, offset=(0, 0)):
+        x, y = self.rect.x + offset[0], self.rect.y + offset[1]
+        area = target.blit(self.surface(), (x, y))
+        if not self.composite:
+            for child in self.children:
+                child.draw(target, (x, y))
+        return area
+
+    def hover(self, pos):
+        local = (pos[0] - self.rect.x, pos[1] - self.rect.y)
+        for child in self.children:
+            child.hover(local)
+
+    def click(self, pos):
+        local = (pos[0] - self.rect.x, pos[1] - self.rect.y)
+        for child in self.children:
+            clicked = child.click(local)
+            if clicked is not None:
+                return clicked
+        return None